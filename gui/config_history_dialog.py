@@ -4,7 +4,7 @@
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QListWidget,
                            QListWidgetItem, QSplitter, QLabel, QPlainTextEdit, QMessageBox,
                            QInputDialog, QWidget, QTabWidget)
-from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtCore import Qt, QSize, QTimer, QPoint
 from PyQt5.QtGui import QIcon, QTextCharFormat, QBrush, QColor
 
 from utils.config_history import ConfigHistoryManager
@@ -46,6 +46,7 @@ class ConfigHistoryDialog(QDialog):
         self.history_list = QListWidget()
         self.history_list.setMinimumWidth(300)
         self.history_list.currentItemChanged.connect(self.on_history_selected)
+        self._watch_visible_descriptions(self.history_list)
         left_layout.addWidget(self.history_list)
         
         # 历史记录按钮
@@ -147,18 +148,12 @@ class ConfigHistoryDialog(QDialog):
             # 清空列表
             self.history_list.clear()
             
-            # 添加历史记录项目
+            # 添加历史记录项目（只为可见的行和选中的行加载描述）
             for history in history_list:
                 item = QListWidgetItem(f"{history['date']}")
-                if history['description']:
-                    item.setToolTip(history['description'])
-                    # 设置第二行显示描述，限制长度
-                    desc = history['description']
-                    if len(desc) > 30:
-                        desc = desc[:27] + "..."
-                    item.setText(f"{history['date']}\n{desc}")
                 item.setData(Qt.UserRole, history)
                 self.history_list.addItem(item)
+            self._schedule_visible_descriptions(self.history_list)
             
             # 禁用恢复和对比按钮
             self.restore_btn.setEnabled(False)
@@ -199,6 +194,9 @@ class ConfigHistoryDialog(QDialog):
                 QMessageBox.warning(self, "警告", f"无法加载历史记录内容: {error}")
                 return
             
+            # 已读取完整内容，顺带补充列表项的描述
+            self._set_item_description(current, history_content.get("description", ""))
+            
             # 显示内容（格式化为美观的JSON）
             config_data = history_content.get("config", {})
             formatted_json = json.dumps(config_data, ensure_ascii=False, indent=2)
@@ -212,6 +210,58 @@ class ConfigHistoryDialog(QDialog):
             self.logger.error(f"加载历史记录内容失败: {e}")
             QMessageBox.critical(self, "错误", f"加载历史记录内容失败: {e}")
     
+    def _set_item_description(self, item, description):
+        """在列表项中显示历史记录描述"""
+        history = item.data(Qt.UserRole)
+        history['description'] = description or ""
+        item.setData(Qt.UserRole, history)
+        if description:
+            item.setToolTip(description)
+            # 设置第二行显示描述，限制长度
+            desc = description
+            if len(desc) > 30:
+                desc = desc[:27] + "..."
+            item.setText(f"{history['date']}\n{desc}")
+    
+    def showEvent(self, event):
+        """对话框显示后列表才有实际高度，此时加载可见行的描述"""
+        super().showEvent(event)
+        self._schedule_visible_descriptions(self.history_list)
+    
+    def _watch_visible_descriptions(self, list_widget):
+        """滚动列表时为新进入视口的行加载描述"""
+        list_widget.verticalScrollBar().valueChanged.connect(
+            lambda value: self._schedule_visible_descriptions(list_widget)
+        )
+    
+    def _schedule_visible_descriptions(self, list_widget):
+        """等布局完成后再计算可见行"""
+        QTimer.singleShot(0, lambda: self._load_visible_descriptions(list_widget))
+    
+    def _load_visible_descriptions(self, list_widget):
+        """只为当前视口内可见的行读取描述，其余行在滚动到可见或被选中时再读取"""
+        try:
+            viewport_height = list_widget.viewport().height()
+        except RuntimeError:
+            # 列表控件已被销毁
+            return
+        first_row = list_widget.indexAt(QPoint(0, 0)).row()
+        if first_row < 0:
+            return
+        for row in range(first_row, list_widget.count()):
+            item = list_widget.item(row)
+            if list_widget.visualItemRect(item).top() >= viewport_height:
+                break
+            self._load_item_description(item)
+    
+    def _load_item_description(self, item):
+        """按需读取并显示列表项的描述"""
+        if item is None:
+            return
+        history = item.data(Qt.UserRole)
+        if history.get('description') is None:
+            self._set_item_description(item, self.history_manager.get_history_description(history['filename']))
+    
     def compare_with_current(self):
         """将选中的历史记录与当前配置进行对比"""
         try:
@@ -287,18 +337,24 @@ class ConfigHistoryDialog(QDialog):
             list_widget = QListWidget()
             layout.addWidget(list_widget)
             
-            # 添加历史记录项目
+            # 添加历史记录项目（只为可见的行和选中的行加载描述）
+            # 主列表中已经读取过的描述直接复用
+            known_descriptions = {}
+            for row in range(self.history_list.count()):
+                loaded = self.history_list.item(row).data(Qt.UserRole)
+                if loaded.get('description') is not None:
+                    known_descriptions[loaded['filename']] = loaded['description']
             for history in histories:
                 item = QListWidgetItem(f"{history['date']}")
-                if history['description']:
-                    item.setToolTip(history['description'])
-                    # 设置第二行显示描述，限制长度
-                    desc = history['description']
-                    if len(desc) > 30:
-                        desc = desc[:27] + "..."
-                    item.setText(f"{history['date']}\n{desc}")
                 item.setData(Qt.UserRole, history)
+                if history['filename'] in known_descriptions:
+                    self._set_item_description(item, known_descriptions[history['filename']])
                 list_widget.addItem(item)
+            list_widget.currentItemChanged.connect(
+                lambda current, previous: self._load_item_description(current)
+            )
+            self._watch_visible_descriptions(list_widget)
+            self._schedule_visible_descriptions(list_widget)
             
             # 添加按钮
             buttons_layout = QHBoxLayout()
@@ -387,9 +443,6 @@ class ConfigHistoryDialog(QDialog):
                 # 删除行 - 红色
                 format.setForeground(QBrush(QColor("#CC0000")))
                 format.setBackground(QBrush(QColor("#FFECEC")))
-            elif line.startswith('?'):
-                # 提示行 - 蓝色
-                format.setForeground(QBrush(QColor("#0000CC")))
             
             # 应用格式
             if format.foreground().color() != QColor():
@@ -7,6 +7,7 @@ import sys
 import math
 import time
 import copy
+import threading
 import psutil
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, 
                             QHBoxLayout, QPushButton, QLabel, QLineEdit, 
@@ -48,6 +49,9 @@ from gui.tag_manager_dialog import TagManagerDialog
 from gui.icon_loader import get_icon_loader
 from utils.path_utils import resource_path
 
+# 退出前等待自动上传完成的最长时间（秒），网络缓慢时不长时间阻塞窗口关闭
+EXIT_AUTO_UPLOAD_TIMEOUT = 5
+
 # 配置加载器类
 class ConfigLoader(QObject):
     """异步配置加载器"""
@@ -665,6 +669,12 @@ class LaunchGUI(QMainWindow):
         
         # 检查是否需要自动同步配置
         # self.check_auto_sync() # 禁用启动时的自动同步
+        
+        # 自动上传防抖定时器：短时间内的多次配置修改合并为一次上传
+        self.auto_upload_timer = QTimer(self)
+        self.auto_upload_timer.setSingleShot(True)
+        self.auto_upload_timer.setInterval(2000)
+        self.auto_upload_timer.timeout.connect(self._start_auto_upload)
     
     def add_category(self, name):
         """添加分类标签页"""
@@ -1596,6 +1606,11 @@ class LaunchGUI(QMainWindow):
             # 刷新未保存的配置
             flush_config()
             
+            # 退出前完成尚在等待中的自动上传
+            if hasattr(self, 'auto_upload_timer') and self.auto_upload_timer.isActive():
+                self.auto_upload_timer.stop()
+                self._start_auto_upload(blocking=True)
+            
             # 停止所有定时器
             if hasattr(self, 'main_timer') and self.main_timer:
                 self.main_timer.stop()
@@ -2645,7 +2660,17 @@ class LaunchGUI(QMainWindow):
 
 
     def auto_upload_config(self):
-        """配置修改后自动上传配置"""
+        """配置修改后自动上传配置（防抖，2 秒内的多次修改只上传一次）"""
+        self.auto_upload_timer.start()
+    
+    def _start_auto_upload(self, blocking=False):
+        """
+        上传配置到启用了自动同步的服务
+        
+        Args:
+            blocking (bool): 为 True 时等待上传完成（退出前使用，最多等待 EXIT_AUTO_UPLOAD_TIMEOUT 秒），
+                否则在后台线程中执行
+        """
         try:
             self.logger.debug("开始自动上传配置")
 
@@ -2672,6 +2697,19 @@ class LaunchGUI(QMainWindow):
                 self.logger.debug("没有启用的自动同步服务，跳过自动上传")
                 return
             
+            if blocking:
+                # 在守护线程中上传并限时等待，超时后放弃，进程退出时线程随之结束
+                worker = SyncWorker("upload")
+                upload_thread = threading.Thread(target=worker.run, name="exit-auto-upload", daemon=True)
+                upload_thread.start()
+                upload_thread.join(EXIT_AUTO_UPLOAD_TIMEOUT)
+                if upload_thread.is_alive():
+                    worker.should_stop = True
+                    self.logger.warning(f"退出前自动上传超过 {EXIT_AUTO_UPLOAD_TIMEOUT} 秒未完成，已放弃等待")
+                else:
+                    self.logger.info("退出前自动上传已完成")
+                return
+            
             # 创建线程和Worker进行上传
             self.auto_upload_thread = QThread()
             self.auto_upload_worker = SyncWorker("upload")
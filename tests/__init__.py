@@ -5,4 +5,48 @@
 测试模块
 
 包含项目的各种测试文件
-"""
\ No newline at end of file
+"""
+
+import atexit
+import os
+import tempfile
+import uuid
+
+# 单实例测试使用的 app_id 前缀，对应临时目录中的 .lock/.port 文件
+STALE_ARTIFACT_PREFIX = "work-stack-test-"
+STALE_ARTIFACT_SUFFIXES = (".lock", ".port")
+# macOS 上单实例使用的 UNIX 套接字文件目录（与 utils.single_instance._SOCKET_DIR 一致）
+SOCKET_DIR = "/tmp"
+
+# 本进程生成过的测试 app_id，退出时只清理这些 app_id 对应的文件
+_created_app_ids = set()
+
+
+def new_test_app_id() -> str:
+    """生成单实例测试使用的唯一 app_id，并记录下来以便退出时清理"""
+    app_id = f"{STALE_ARTIFACT_PREFIX}{uuid.uuid4().hex}"
+    _created_app_ids.add(app_id)
+    return app_id
+
+
+def _artifact_paths(app_id: str) -> list:
+    """单实例管理器为 app_id 创建的锁文件、端口文件和套接字文件路径"""
+    directory = tempfile.gettempdir()
+    paths = [os.path.join(directory, app_id + suffix) for suffix in STALE_ARTIFACT_SUFFIXES]
+    if hasattr(os, "getuid"):
+        # Linux 使用抽象命名空间不会留下文件，对应路径不存在时直接跳过
+        paths.append(os.path.join(SOCKET_DIR, f"{app_id}-{os.getuid()}.sock"))
+    return paths
+
+
+def _cleanup_stale_workstack_tmp():
+    """测试会话结束时一次性清理本进程残留的测试文件（例如失败用例未释放的锁文件和套接字文件）"""
+    for app_id in _created_app_ids:
+        for path in _artifact_paths(app_id):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+atexit.register(_cleanup_stale_workstack_tmp)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试用的常驻 Python 子进程
+
+从 stdin 逐行读取 JSON 请求 {"code": ..., "env": {...}}，在替换后的环境变量下执行代码，
+并以一行 JSON {"stdout": ..., "error": ...} 返回结果，避免每个代码片段都重新启动解释器。
+"""
+
+import atexit
+import contextlib
+import io
+import json
+import os
+import sys
+import traceback
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+
+def _preload_modules():
+    """
+    预先导入项目模块依赖的标准库和第三方库，片段执行前只需重新导入项目模块。
+
+    项目模块（utils 包）不能在这里导入：其中不少模块在导入时读取环境变量或缓存平台信息，
+    因此每个片段都在替换环境变量后重新导入全部项目模块。
+    """
+    import logging.handlers  # noqa: F401
+    import mmap  # noqa: F401
+    import pathlib  # noqa: F401
+    import platform  # noqa: F401
+    import shutil  # noqa: F401
+    import threading  # noqa: F401
+    from datetime import datetime  # noqa: F401
+
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        pass
+
+
+def _shutdown_project_modules():
+    """
+    停止上一轮导入的模块启动的后台线程并注销其 atexit 钩子，避免重新导入时不断累积。
+
+    config_manager 的写入线程在写完待保存配置后退出；logger 的处理器挂在标准库的
+    logging 记录器上，不清除的话重新导入的 logger 会沿用旧的队列和监听线程。
+    """
+    config_manager = sys.modules.get("utils.config_manager")
+    if config_manager is not None:
+        atexit.unregister(config_manager._shutdown_writer)
+        config_manager._shutdown_writer()
+
+    logger_module = sys.modules.get("utils.logger")
+    if logger_module is not None and logger_module._listener is not None:
+        listener = logger_module._listener
+        atexit.unregister(listener.stop)
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+        logger_module._logger.handlers.clear()
+
+
+def _reset_project_modules():
+    _shutdown_project_modules()
+    for name in list(sys.modules):
+        if name == "utils" or name.startswith("utils."):
+            del sys.modules[name]
+
+
+def _run(request):
+    os.environ.clear()
+    os.environ.update(request["env"])
+    _reset_project_modules()
+
+    stdout = io.StringIO()
+    error = None
+    with contextlib.redirect_stdout(stdout):
+        try:
+            exec(request["code"], {"__name__": "__main__"})
+        except BaseException:
+            error = traceback.format_exc()
+    return {"stdout": stdout.getvalue(), "error": error}
+
+
+def main():
+    _preload_modules()
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        response = _run(json.loads(line))
+        sys.stdout.write(json.dumps(response, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -11,9 +11,43 @@ from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 PYTHON_EXECUTABLE = sys.executable
+WORKER_SCRIPT = Path(__file__).resolve().with_name("_snippet_worker.py")
 
 
-def run_python_snippet(snippet: str, env: dict) -> subprocess.CompletedProcess:
+class WorkerProcess:
+    """常驻的 Python 子进程，复用解释器启动开销来执行多个代码片段"""
+
+    def __init__(self):
+        self.process = subprocess.Popen(
+            [PYTHON_EXECUTABLE, "-u", str(WORKER_SCRIPT)],
+            cwd=PROJECT_ROOT,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+        )
+
+    def run(self, snippet: str, env: dict) -> subprocess.CompletedProcess:
+        request = {"code": snippet, "env": env}
+        self.process.stdin.write(json.dumps(request, ensure_ascii=False) + "\n")
+        self.process.stdin.flush()
+        line = self.process.stdout.readline()
+        if not line:
+            raise RuntimeError("snippet worker exited unexpectedly")
+        response = json.loads(line)
+        args = [PYTHON_EXECUTABLE, "-c", snippet]
+        if response["error"]:
+            raise subprocess.CalledProcessError(1, args, response["stdout"], response["error"])
+        return subprocess.CompletedProcess(args, 0, response["stdout"], "")
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait(timeout=5)
+
+
+def run_python_snippet(snippet: str, env: dict, worker: WorkerProcess = None) -> subprocess.CompletedProcess:
+    if worker is not None:
+        return worker.run(snippet, env)
     return subprocess.run(
         [PYTHON_EXECUTABLE, "-c", snippet],
         cwd=PROJECT_ROOT,
@@ -25,7 +59,24 @@ def run_python_snippet(snippet: str, env: dict) -> subprocess.CompletedProcess:
     )
 
 
+def list_legacy_backups(legacy_dir: str) -> set:
+    with os.scandir(legacy_dir) as entries:
+        return {
+            entry.name
+            for entry in entries
+            if entry.name.startswith("config.json.migrated-") and entry.name.endswith(".bak")
+        }
+
+
 class ConfigStorageTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.worker = WorkerProcess()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.worker.close()
+
     def test_load_config_returns_defaults_for_empty_user_dir(self):
         with tempfile.TemporaryDirectory() as user_dir:
             env = os.environ.copy()
@@ -40,7 +91,7 @@ config = load_config()
 print(json.dumps(config, ensure_ascii=False))
 print(CONFIG_PATH)
 """
-            result = run_python_snippet(snippet, env)
+            result = run_python_snippet(snippet, env, self.worker)
             lines = [line for line in result.stdout.splitlines() if line.strip()]
             self.assertGreaterEqual(len(lines), 2, msg=result.stdout)
             config = json.loads(lines[0])
@@ -67,19 +118,155 @@ print(CONFIG_PATH)
 from utils.config_manager import load_config
 load_config()
 """
-            run_python_snippet(snippet, env)
+            run_python_snippet(snippet, env, self.worker)
 
             config_file = Path(user_dir) / "config.json"
             self.assertTrue(config_file.exists())
             on_disk = json.loads(config_file.read_text(encoding="utf-8"))
             self.assertEqual(payload, on_disk)
 
-            backups = list(Path(legacy_dir).glob("config.json.migrated-*.bak"))
+            backups = list_legacy_backups(legacy_dir)
             self.assertEqual(1, len(backups))
 
             # Running again should not create more backups
+            run_python_snippet(snippet, env, self.worker)
+            self.assertEqual(backups, list_legacy_backups(legacy_dir))
+
+    def test_moves_legacy_history_directory(self):
+        with tempfile.TemporaryDirectory() as user_dir, tempfile.TemporaryDirectory() as legacy_root:
+            legacy_dir = Path(legacy_root) / "config_history"
+            legacy_dir.mkdir()
+            (legacy_dir / "config_20240101_000000.json").write_text("{}", encoding="utf-8")
+
+            env = os.environ.copy()
+            env["WORKSTACK_USER_DATA_DIR"] = user_dir
+            env["WORKSTACK_LEGACY_CONFIG_PATH"] = str(Path(legacy_root) / "config.json")
+            env["WORKSTACK_LEGACY_HISTORY_DIR"] = str(legacy_dir)
+            env["PYTHONIOENCODING"] = "utf-8"
+
+            snippet = """
+import utils.config_history
+"""
+            run_python_snippet(snippet, env, self.worker)
+
+            history_dir = Path(user_dir) / "config_history"
+            self.assertTrue((history_dir / "config_20240101_000000.json").exists())
+            self.assertFalse(legacy_dir.exists())
+            markers = [p.name for p in Path(legacy_root).iterdir() if p.name.startswith("config_history.migrated-")]
+            self.assertEqual(1, len(markers))
+            self.assertTrue(markers[0].endswith(".txt"))
+
+    def test_copies_legacy_history_directory_when_rename_fails(self):
+        with tempfile.TemporaryDirectory() as user_dir, tempfile.TemporaryDirectory() as legacy_root:
+            legacy_dir = Path(legacy_root) / "config_history"
+            legacy_dir.mkdir()
+            (legacy_dir / "config_20240101_000000.json").write_text("{}", encoding="utf-8")
+            # 之前启动时已创建的空目录不应阻止迁移
+            (Path(user_dir) / "config_history").mkdir()
+
+            env = os.environ.copy()
+            env["WORKSTACK_USER_DATA_DIR"] = user_dir
+            env["PYTHONIOENCODING"] = "utf-8"
+
+            snippet = f"""
+from pathlib import Path
+from unittest import mock
+from utils.path_utils import migrate_legacy_directory
+with mock.patch("utils.path_utils.os.rename", side_effect=OSError("cross-device link")):
+    print(migrate_legacy_directory(Path({str(legacy_dir)!r}), Path({user_dir!r}) / "config_history"))
+"""
+            result = run_python_snippet(snippet, env, self.worker)
+
+            history_dir = Path(user_dir) / "config_history"
+            self.assertTrue((history_dir / "config_20240101_000000.json").exists())
+            self.assertFalse(legacy_dir.exists())
+            backup = Path(result.stdout.strip())
+            self.assertTrue(backup.name.startswith("config_history.migrated-"))
+            self.assertTrue((backup / "config_20240101_000000.json").exists())
+
+    def test_delayed_save_snapshots_config(self):
+        with tempfile.TemporaryDirectory() as user_dir:
+            env = os.environ.copy()
+            env["WORKSTACK_USER_DATA_DIR"] = user_dir
+            env["WORKSTACK_LEGACY_CONFIG_PATH"] = str(Path(user_dir) / "legacy.json")
+            env["PYTHONIOENCODING"] = "utf-8"
+
+            snippet = """
+from utils.config_manager import load_config, save_config, flush_config
+config = load_config()
+config["programs"] = [{"name": "Saved"}]
+save_config(config)
+# 与 update_config 相同：重建列表时先替换为新列表再逐项添加
+config = load_config()
+config["programs"] = []
+config["programs"].append({"name": "Unsaved"})
+flush_config()
+"""
+            run_python_snippet(snippet, env, self.worker)
+
+            on_disk = json.loads((Path(user_dir) / "config.json").read_text(encoding="utf-8"))
+            self.assertEqual([{"name": "Saved"}], on_disk["programs"])
+
+    def test_delayed_save_survives_interpreter_exit(self):
+        with tempfile.TemporaryDirectory() as user_dir:
+            env = os.environ.copy()
+            env["WORKSTACK_USER_DATA_DIR"] = user_dir
+            env["WORKSTACK_LEGACY_CONFIG_PATH"] = str(Path(user_dir) / "legacy.json")
+            env["PYTHONIOENCODING"] = "utf-8"
+
+            snippet = """
+from utils import config_manager
+config_manager.SAVE_DELAY = 60
+config = config_manager.load_config()
+config["programs"] = [{"name": "Pending"}]
+config_manager.save_config(config)
+"""
+            # 使用独立进程，解释器退出时才会触发 atexit 刷新
             run_python_snippet(snippet, env)
-            self.assertEqual(backups, list(Path(legacy_dir).glob("config.json.migrated-*.bak")))
+
+            on_disk = json.loads((Path(user_dir) / "config.json").read_text(encoding="utf-8"))
+            self.assertEqual([{"name": "Pending"}], on_disk["programs"])
+
+    def test_compare_configs_output_format(self):
+        with tempfile.TemporaryDirectory() as user_dir:
+            env = os.environ.copy()
+            env["WORKSTACK_USER_DATA_DIR"] = user_dir
+            env["WORKSTACK_LEGACY_CONFIG_PATH"] = str(Path(user_dir) / "legacy.json")
+            env["WORKSTACK_LEGACY_HISTORY_DIR"] = str(Path(user_dir) / "legacy_history")
+            env["PYTHONIOENCODING"] = "utf-8"
+
+            snippet = """
+import json
+from utils.config_history import ConfigHistoryManager
+old = {"categories": ["工作"], "programs": [{"name": "A"}, {"name": "B"}]}
+new = {"categories": ["工作"], "programs": [{"name": "A2"}, {"name": "B"}], "theme": "dark"}
+print(json.dumps(ConfigHistoryManager().compare_configs(old, new), ensure_ascii=False))
+"""
+            result = run_python_snippet(snippet, env, self.worker)
+            diff = json.loads(result.stdout.strip().splitlines()[-1])
+
+            # 不输出 Differ 的 "? " 提示行，替换块先删除后新增
+            self.assertEqual(
+                [
+                    "  {",
+                    "    \"categories\": [",
+                    "      \"工作\"",
+                    "    ],",
+                    "    \"programs\": [",
+                    "      {",
+                    "-       \"name\": \"A\"",
+                    "+       \"name\": \"A2\"",
+                    "      },",
+                    "      {",
+                    "        \"name\": \"B\"",
+                    "      }",
+                    "-   ]",
+                    "+   ],",
+                    "+   \"theme\": \"dark\"",
+                    "  }",
+                ],
+                diff,
+            )
 
     @unittest.skipUnless(sys.platform.startswith("win"), "Windows-specific expectation")
     def test_windows_user_dir_uses_appdata(self):
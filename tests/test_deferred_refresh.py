@@ -2,32 +2,42 @@
 # -*- coding: utf-8 -*-
 
 import unittest
-import copy
 
 from PyQt5.QtWidgets import QApplication
 
 from gui.main_window import LaunchGUI
+from utils import json_utils
 from utils.config_manager import load_config, save_config
 
 
+def clone_config(config):
+    """通过 JSON 往返复制配置，比 copy.deepcopy 逐节点遍历更快"""
+    return json_utils.loads(json_utils.dumps(config, indent=False))
+
+
 class DeferredRefreshTest(unittest.TestCase):
     """验证后台刷新延迟策略"""
 
     @classmethod
     def setUpClass(cls):
         cls._app = QApplication.instance() or QApplication([])
+        cls._window = LaunchGUI()
+        cls._window.hide()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._window.close()
 
     def setUp(self):
-        self._original_config = copy.deepcopy(load_config())
-        self.window = LaunchGUI()
-        self.window.hide()
+        self._original_config = clone_config(load_config())
+        self.window = self._window
+        self.window._pending_ui_refresh = False
 
     def tearDown(self):
         save_config(self._original_config, immediate=True)
-        self.window.close()
 
     def test_background_refresh_is_applied_on_demand(self):
-        new_config = copy.deepcopy(self._original_config)
+        new_config = clone_config(self._original_config)
         new_config["test_case"] = "deferred-refresh"
 
         applied = self.window.apply_background_config(new_config, "单元测试")
@@ -5,7 +5,7 @@ import time
 import unittest
 
 from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import QSize
+from PyQt5.QtCore import QEventLoop, QSize, QTimer
 
 from gui.icon_loader import get_icon_loader, DEFAULT_ICON_PATH
 
@@ -30,14 +30,27 @@ class IconLoaderTest(unittest.TestCase):
         self.results[ticket] = pixmap
 
     def _wait_for_tickets(self, tickets, timeout=2000):
-        deadline = time.time() + timeout / 1000.0
-        while time.time() < deadline:
-            if all(ticket in self.results for ticket in tickets):
-                return
-            QApplication.processEvents()
-            time.sleep(0.01)
+        if not all(ticket in self.results for ticket in tickets):
+            loop = QEventLoop()
+
+            def on_icon_ready(*_):
+                if all(ticket in self.results for ticket in tickets):
+                    loop.quit()
+
+            # 在 _handle_icon_ready 之后连接，回调时结果已写入
+            self.loader.icon_ready.connect(on_icon_ready)
+            timer = QTimer()
+            timer.setSingleShot(True)
+            timer.timeout.connect(loop.quit)
+            timer.start(timeout)
+            try:
+                loop.exec_()
+            finally:
+                timer.stop()
+                self.loader.icon_ready.disconnect(on_icon_ready)
         missing = [t for t in tickets if t not in self.results]
-        self.fail(f"未在超时时间内收到图标: {missing}")
+        if missing:
+            self.fail(f"未在超时时间内收到图标: {missing}")
 
     def test_deduplicated_requests_receive_single_load(self):
         size = QSize(24, 24)
@@ -1,7 +1,7 @@
 import threading
 import unittest
-import uuid
 
+from tests import new_test_app_id
 from utils.single_instance import SingleInstanceManager
 
 
@@ -16,7 +16,7 @@ class SingleInstanceManagerTests(unittest.TestCase):
             self.primary_manager = None
 
     def change_app_id(self):
-        self.app_id = f"work-stack-test-{uuid.uuid4().hex}"
+        self.app_id = new_test_app_id()
         self.primary_manager = None
 
     def test_acquire_blocks_second_instance_until_release(self):
@@ -2,12 +2,11 @@
 # -*- coding: utf-8 -*-
 
 import os
-import sys
+import re
+import shutil
 import subprocess
 import webbrowser
 import time
-import threading
-import platform
 from typing import List, Dict, Any, Optional, Union
 
 from utils.os_utils import get_os_type, expand_path
@@ -16,6 +15,60 @@ from utils.logger import get_logger
 # 获取日志记录器
 logger = get_logger()
 
+_OS_TYPE = get_os_type()
+
+
+def _resolve_on_path(command: str) -> str:
+    """Linux 下在导入时解析命令的绝对路径，避免每次启动都按 PATH 逐个查找"""
+    if _OS_TYPE != "linux":
+        return command
+    return shutil.which(command) or command
+
+
+_BROWSER_PATHS = {
+    "windows": {
+        "chrome": r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+        "edge": r"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe",
+        "firefox": r"C:\Program Files\Mozilla Firefox\firefox.exe",
+    },
+    "mac": {
+        "chrome": "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+        "edge": "/Applications/Microsoft Edge.app/Contents/MacOS/Microsoft Edge",
+        "firefox": "/Applications/Firefox.app/Contents/MacOS/firefox",
+        "safari": "/Applications/Safari.app/Contents/MacOS/Safari"
+    },
+    "linux": {
+        "chrome": _resolve_on_path("google-chrome"),
+        "edge": _resolve_on_path("microsoft-edge"),
+        "firefox": _resolve_on_path("firefox"),
+    }
+}
+
+_VSCODE_PATHS = {
+    "windows": "C:/Program Files/Microsoft VS Code/Code.exe",  # Windows通常将VSCode添加到PATH
+    "mac": "/Applications/Visual Studio Code.app/Contents/Resources/app/bin/code",
+    "linux": _resolve_on_path("code")  # Linux通常将VSCode添加到PATH
+}
+
+_CURSOR_APP_PATHS = {
+    "windows": "",  # 将通过动态检测找到
+    "mac": "/Applications/Cursor.app/Contents/MacOS/Cursor",
+    "linux": _resolve_on_path("cursor")  # Linux通常将Cursor添加到PATH
+}
+
+# 打开 Obsidian URI 的命令；Windows 上为 None，改用 os.startfile 交由系统直接分发
+_OBSIDIAN_URI_LAUNCHER = {"mac": ["open"], "linux": ["xdg-open"]}.get(_OS_TYPE)
+
+# URI 打开失败时直接启动 Obsidian 的后备路径
+_OBSIDIAN_APP_PATHS = {
+    "windows": "",  # 将通过动态检测找到
+    "mac": "/Applications/Obsidian.app/Contents/MacOS/Obsidian",
+    "linux": _resolve_on_path("obsidian")  # Linux通常将Obsidian添加到PATH
+}
+
+# 保险库名称只允许字母、数字、中文、下划线、连字符和空格
+_VAULT_NAME_PATTERN = re.compile(r'^[\w\u4e00-\u9fff\s\-]+$')
+
 def get_app_path(app_name: str, fallback_paths: Dict[str, str]) -> Optional[str]:
     """
     动态检测应用程序路径
@@ -27,7 +80,7 @@ def get_app_path(app_name: str, fallback_paths: Dict[str, str]) -> Optional[str]
     Returns:
         找到的应用程序路径，如果未找到返回None
     """
-    os_type = get_os_type()
+    os_type = _OS_TYPE
     
     # Windows特殊处理：使用环境变量构建常见路径
     if os_type == "windows":
@@ -45,7 +98,7 @@ def get_app_path(app_name: str, fallback_paths: Dict[str, str]) -> Optional[str]
         # 检查这些路径是否存在
         for path in common_paths:
             if os.path.exists(path):
-                logger.debug(f"找到 {app_name} 路径: {path}")
+                logger.debug("找到 %s 路径: %s", app_name, path)
                 return path
     
     # 使用后备路径
@@ -54,13 +107,12 @@ def get_app_path(app_name: str, fallback_paths: Dict[str, str]) -> Optional[str]
         return fallback_path
         
     # 最后尝试在PATH中查找
-    import shutil
     path_cmd = shutil.which(app_name.lower())
     if path_cmd:
-        logger.debug(f"在PATH中找到 {app_name}: {path_cmd}")
+        logger.debug("在PATH中找到 %s: %s", app_name, path_cmd)
         return path_cmd
     
-    logger.warning(f"未找到 {app_name} 的路径")
+    logger.warning("未找到 %s 的路径", app_name)
     return None
 
 def open_browser(browser_name: str, urls: List[str], window_name: Optional[str] = None) -> None:
@@ -72,30 +124,10 @@ def open_browser(browser_name: str, urls: List[str], window_name: Optional[str]
         urls: 要打开的URL列表
         window_name: 可选的窗口名称（已弃用，保留参数以兼容现有配置）
     """
-    os_type = get_os_type()
-    browser_paths = {
-        "windows": {
-            "chrome": r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-            "edge": r"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe",
-            "firefox": r"C:\Program Files\Mozilla Firefox\firefox.exe",
-        },
-        "mac": {
-            "chrome": "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
-            "edge": "/Applications/Microsoft Edge.app/Contents/MacOS/Microsoft Edge",
-            "firefox": "/Applications/Firefox.app/Contents/MacOS/firefox",
-            "safari": "/Applications/Safari.app/Contents/MacOS/Safari"
-        },
-        "linux": {
-            "chrome": "google-chrome",
-            "edge": "microsoft-edge",
-            "firefox": "firefox",
-        }
-    }
-    
-    browser_cmd = browser_paths.get(os_type, {}).get(browser_name.lower())
+    browser_cmd = _BROWSER_PATHS.get(_OS_TYPE, {}).get(browser_name.lower())
     
     if not browser_cmd:
-        logger.warning(f"未找到浏览器: {browser_name}，尝试使用系统默认浏览器")
+        logger.warning("未找到浏览器: %s，尝试使用系统默认浏览器", browser_name)
         for url in urls:
             webbrowser.open(url)
         return
@@ -112,14 +144,14 @@ def open_browser(browser_name: str, urls: List[str], window_name: Optional[str]
     # 添加URL
     cmd.extend(urls)
     
-    logger.debug(f"执行命令: {cmd}")
+    logger.debug("执行命令: %s", cmd)
     
     try:
         subprocess.Popen(cmd)
         # 给浏览器一些启动时间
         time.sleep(1)
     except Exception as e:
-        logger.error(f"启动浏览器时出错: {e}")
+        logger.error("启动浏览器时出错: %s", e)
         logger.info("尝试使用系统默认浏览器")
         for url in urls:
             webbrowser.open(url)
@@ -131,15 +163,7 @@ def open_vscode(project_path: str) -> None:
     Args:
         project_path: 项目路径或完整的VSCode参数
     """
-    os_type = get_os_type()
-    
-    vscode_paths = {
-        "windows": "C:/Program Files/Microsoft VS Code/Code.exe",  # Windows通常将VSCode添加到PATH
-        "mac": "/Applications/Visual Studio Code.app/Contents/Resources/app/bin/code",
-        "linux": "code"  # Linux通常将VSCode添加到PATH
-    }
-    
-    vscode_cmd = vscode_paths.get(os_type)
+    vscode_cmd = _VSCODE_PATHS.get(_OS_TYPE)
     
     if not vscode_cmd:
         logger.error("未找到VSCode")
@@ -157,15 +181,15 @@ def open_vscode(project_path: str) -> None:
                 param_value = parts[1].strip('"\'')
                 cmd.append(param_value)
                 
-            logger.debug(f'执行命令: {cmd}')
+            logger.debug("执行命令: %s", cmd)
             subprocess.Popen(cmd)
         else:
             # 展开用户目录（如 ~/projects）并作为路径处理
             expanded_path = expand_path(project_path)
-            logger.debug(f'执行命令: {vscode_cmd} {expanded_path}')
+            logger.debug("执行命令: %s %s", vscode_cmd, expanded_path)
             subprocess.Popen([vscode_cmd, expanded_path])
     except Exception as e:
-        logger.error(f"启动VSCode时出错: {e}")
+        logger.error("启动VSCode时出错: %s", e)
 
 def open_cursor(project_path: str) -> None:
     """
@@ -174,13 +198,7 @@ def open_cursor(project_path: str) -> None:
     Args:
         project_path: 项目路径或完整的Cursor参数
     """
-    cursor_fallback_paths = {
-        "windows": "",  # 将通过动态检测找到
-        "mac": "/Applications/Cursor.app/Contents/MacOS/Cursor",
-        "linux": "cursor"  # Linux通常将Cursor添加到PATH
-    }
-    
-    cursor_cmd = get_app_path("Cursor", cursor_fallback_paths)
+    cursor_cmd = get_app_path("Cursor", _CURSOR_APP_PATHS)
     
     if not cursor_cmd:
         logger.error("未找到Cursor应用程序")
@@ -198,15 +216,15 @@ def open_cursor(project_path: str) -> None:
                 param_value = parts[1].strip('"\'')
                 cmd.append(param_value)
                 
-            logger.debug(f'执行命令: {cmd}')
+            logger.debug("执行命令: %s", cmd)
             subprocess.Popen(cmd)
         else:
             # 展开用户目录（如 ~/projects）并作为路径处理
             expanded_path = expand_path(project_path)
-            logger.debug(f'执行命令: {cursor_cmd} {expanded_path}')
+            logger.debug("执行命令: %s %s", cursor_cmd, expanded_path)
             subprocess.Popen([cursor_cmd, expanded_path])
     except Exception as e:
-        logger.error(f"启动Cursor时出错: {e}")
+        logger.error("启动Cursor时出错: %s", e)
 
 def open_obsidian(vault_path: str) -> None:
     """
@@ -215,10 +233,6 @@ def open_obsidian(vault_path: str) -> None:
     Args:
         vault_path: Obsidian保险库路径或保险库名称
     """
-    import re
-    
-    os_type = get_os_type()
-    
     # 输入验证 - 防止恶意输入
     if not vault_path or len(vault_path.strip()) == 0:
         logger.error("保险库路径为空")
@@ -231,34 +245,26 @@ def open_obsidian(vault_path: str) -> None:
         vault_name = vault_path
     
     # 验证保险库名称 - 只允许字母、数字、中文、下划线、连字符和空格
-    if not re.match(r'^[\w\u4e00-\u9fff\s\-]+$', vault_name):
-        logger.error(f"无效的保险库名称: {vault_name}")
+    if not _VAULT_NAME_PATTERN.match(vault_name):
+        logger.error("无效的保险库名称: %s", vault_name)
         return
     
     # 构建Obsidian URI
     obsidian_uri = f"obsidian://open?vault={vault_name}"
     
-    logger.debug(f'打开Obsidian保险库: {vault_name}')
+    logger.debug("打开Obsidian保险库: %s", vault_name)
     
     try:
-        if os_type == "windows":
-            # Use cmd.exe with /c to avoid shell injection
-            subprocess.Popen(["cmd.exe", "/c", "start", obsidian_uri])
-        elif os_type == "mac":
-            subprocess.Popen(["open", obsidian_uri])
-        else:  # Linux
-            subprocess.Popen(["xdg-open", obsidian_uri])
+        if _OBSIDIAN_URI_LAUNCHER is None:
+            # Windows: 直接交给 shell API 处理，不经过 cmd.exe
+            os.startfile(obsidian_uri)
+        else:
+            subprocess.Popen(_OBSIDIAN_URI_LAUNCHER + [obsidian_uri])
     except Exception as e:
-        logger.error(f"启动Obsidian时出错: {e}")
+        logger.error("启动Obsidian时出错: %s", e)
         
         # 回退到直接启动Obsidian的方式
-        obsidian_fallback_paths = {
-            "windows": "",  # 将通过动态检测找到  
-            "mac": "/Applications/Obsidian.app/Contents/MacOS/Obsidian",
-            "linux": "obsidian"  # Linux通常将Obsidian添加到PATH
-        }
-        
-        obsidian_cmd = get_app_path("Obsidian", obsidian_fallback_paths)
+        obsidian_cmd = get_app_path("Obsidian", _OBSIDIAN_APP_PATHS)
         
         if not obsidian_cmd:
             logger.error("未找到Obsidian应用程序")
@@ -267,10 +273,10 @@ def open_obsidian(vault_path: str) -> None:
         try:
             # 展开用户目录（如 ~/Documents/Obsidian）并作为路径处理
             expanded_path = expand_path(vault_path)
-            logger.debug(f'尝试直接启动: {obsidian_cmd} {expanded_path}')
+            logger.debug("尝试直接启动: %s %s", obsidian_cmd, expanded_path)
             subprocess.Popen([obsidian_cmd, expanded_path])
         except Exception as e:
-            logger.error(f"直接启动Obsidian时出错: {e}")
+            logger.error("直接启动Obsidian时出错: %s", e)
 
 def open_app(app_name: str, params: Union[List[str], str] = None) -> None:
     """
@@ -287,22 +293,23 @@ def open_app(app_name: str, params: Union[List[str], str] = None) -> None:
     if isinstance(params, str):
         params = [params]
         
-    os_type = get_os_type()
+    os_type = _OS_TYPE
+    key = app_name.lower()
     
     # 特殊处理常见应用
-    if app_name.lower() == "chrome":
+    if key == "chrome":
         open_browser("chrome", params)
         return
-    elif app_name.lower() in ["edge", "msedge"]:
+    elif key in ["edge", "msedge"]:
         open_browser("edge", params)
         return
-    elif app_name.lower() == "firefox":
+    elif key == "firefox":
         open_browser("firefox", params)
         return
-    elif app_name.lower() == "safari":
+    elif key == "safari":
         open_browser("safari", params)
         return
-    elif app_name.lower() in ["vscode", "code"]:
+    elif key in ["vscode", "code"]:
         if params and len(params) > 0:
             # 对于VSCode，如果是特殊参数（如--folder-uri），直接传递完整参数
             if any(param.startswith("--") for param in params):
@@ -314,7 +321,7 @@ def open_app(app_name: str, params: Union[List[str], str] = None) -> None:
         else:
             open_vscode("")
         return
-    elif app_name.lower() == "cursor":
+    elif key == "cursor":
         if params and len(params) > 0:
             # 对于Cursor，如果是特殊参数（如--folder-uri），直接传递完整参数
             if any(param.startswith("--") for param in params):
@@ -326,7 +333,7 @@ def open_app(app_name: str, params: Union[List[str], str] = None) -> None:
         else:
             open_cursor("")
         return
-    elif app_name.lower() == "obsidian":
+    elif key == "obsidian":
         if params and len(params) > 0:
             # 对于Obsidian，传递保险库路径
             open_obsidian(params[0])
@@ -350,10 +357,10 @@ def open_app(app_name: str, params: Union[List[str], str] = None) -> None:
             cmd.extend(params)
     
     try:
-        logger.debug(f"执行命令: {cmd}")
+        logger.debug("执行命令: %s", cmd)
         subprocess.Popen(cmd)
     except Exception as e:
-        logger.error(f"启动应用程序时出错: {e}")
+        logger.error("启动应用程序时出错: %s", e)
 
 def launch_program(program: Dict[str, Any], config_dir: str) -> None:
     """
@@ -363,7 +370,7 @@ def launch_program(program: Dict[str, Any], config_dir: str) -> None:
         program: 程序配置字典
         config_dir: 配置文件所在目录
     """
-    logger.info(f"正在启动: {program['name']}")
+    logger.info("正在启动: %s", program['name'])
     
     # 处理新的launch_items格式
     if "launch_items" in program:
@@ -372,33 +379,18 @@ def launch_program(program: Dict[str, Any], config_dir: str) -> None:
             params = item.get("params")
             
             if app:
-                logger.debug(f"启动应用: {app}")
+                logger.debug("启动应用: %s", app)
                 open_app(app, params)
     # 处理直接传递的简单配置
     elif "app" in program:
         app = program.get("app")
         params = program.get("params", [])
         
-        logger.debug(f"启动应用: {app}")
-        logger.debug(f"参数: {params}")
+        logger.debug("启动应用: %s", app)
+        logger.debug("参数: %s", params)
         open_app(app, params)
-    # 兼容旧格式
+    # 旧版 config_file 格式已不再支持
     elif "config_file" in program:
-        config_file = program["config_file"]
-        config_path = os.path.join(config_dir, config_file)
-        
-        if not os.path.exists(config_path):
-            logger.error(f"程序配置文件 '{config_path}' 不存在")
-            return
-            
-        try:
-            import json
-            with open(config_path, 'r', encoding='utf-8') as f:
-                program_data = json.load(f)
-                logger.debug(f"已加载配置: {json.dumps(program_data, ensure_ascii=False, indent=2)}")
-                # 处理旧格式的配置
-                # 这里可以添加处理旧格式配置的代码
-        except Exception as e:
-            logger.error(f"处理配置文件时出错: {e}")
+        logger.warning("旧版 config_file 配置格式已不再支持: %s", program.get('name'))
     else:
-        logger.error(f"无法识别的程序配置格式: {program}")
+        logger.error("无法识别的程序配置格式: %s", program)
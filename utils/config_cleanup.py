@@ -2,14 +2,28 @@
 # -*- coding: utf-8 -*-
 
 import os
-import json
-import glob
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from operator import itemgetter
 from utils.logger import get_logger
 from utils.path_utils import get_user_history_dir
 
 logger = get_logger(__name__)
 
+MAX_UNLINK_WORKERS = 8
+# 配置历史文件名 config_YYYYMMDD_HHMMSS.json，分组为时间戳部分
+HISTORY_FILE_RE = re.compile(r'config_(\d{8}_\d{6})\.json')
+
+
+def _safe_unlink(path: str) -> bool:
+    """删除文件，失败时返回 False 而不抛出异常"""
+    try:
+        os.unlink(path)
+        return True
+    except OSError:
+        return False
+
 class ConfigHistoryCleanup:
     """配置历史文件清理工具"""
     
@@ -18,7 +32,64 @@ class ConfigHistoryCleanup:
             self.config_history_dir = config_history_dir
         else:
             self.config_history_dir = str(get_user_history_dir())
+        # 文件名列表缓存，以目录的修改时间作为失效依据；原地改写文件不会改变目录的修改时间，
+        # 因此只缓存文件名，文件大小和修改时间在需要时再读取
+        self._dir_mtime_ns = None
+        self._dir_paths = []
+    
+    def list_history_paths(self) -> list:
+        """
+        获取配置历史文件路径列表，目录修改时间未变化时直接复用上次的扫描结果
+
+        Returns:
+            文件路径列表，调用方不应修改
+        """
+        mtime_ns = os.stat(self.config_history_dir).st_mtime_ns
+        if mtime_ns != self._dir_mtime_ns:
+            self._dir_paths = self._scan_history_paths()
+            self._dir_mtime_ns = mtime_ns
+        return self._dir_paths
+    
+    def list_history_files(self) -> list:
+        """
+        获取配置历史文件列表及其当前的修改时间和大小
+
+        Returns:
+            (文件路径, 修改时间, 文件大小) 元组列表
+        """
+        files = []
+        for path in self.list_history_paths():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((path, stat.st_mtime, stat.st_size))
+        return files
+    
+    def invalidate_cache(self):
+        """使目录列表缓存失效（用于修改时间精度较低的文件系统）"""
+        self._dir_mtime_ns = None
     
+    def _scan_history_paths(self) -> list:
+        """
+        单次遍历历史目录，收集配置历史文件路径
+
+        Returns:
+            文件路径列表
+        """
+        paths = []
+        with os.scandir(self.config_history_dir) as entries:
+            for entry in entries:
+                if not HISTORY_FILE_RE.fullmatch(entry.name):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                paths.append(entry.path)
+        return paths
+
     def cleanup_old_files(self, keep_count: int = 20, max_age_days: int = 30) -> int:
         """
         清理旧的配置历史文件
@@ -35,56 +106,40 @@ class ConfigHistoryCleanup:
             return 0
         
         # 获取所有配置历史文件
-        pattern = os.path.join(self.config_history_dir, 'config_*.json')
-        files = glob.glob(pattern)
+        files = self.list_history_paths()
         
         if len(files) <= keep_count:
             logger.info(f"配置历史文件数量({len(files)})未超过保留数量({keep_count})")
             return 0
         
-        # 按修改时间排序（最新的在前）
-        files_with_time = []
-        for file_path in files:
-            try:
-                mtime = os.path.getmtime(file_path)
-                files_with_time.append((file_path, mtime))
-            except OSError:
-                continue
+        # 按文件名排序（最新的在前）：config_YYYYMMDD_HHMMSS.json 的字典序即时间顺序，
+        # 与 get_history_list 的排序依据一致，且不受同步工具改写修改时间的影响
+        sorted_paths = sorted(files, reverse=True)
         
-        files_with_time.sort(key=lambda x: x[1], reverse=True)
+        cutoff_timestamp = (datetime.now() - timedelta(days=max_age_days)).timestamp()
         
-        deleted_count = 0
-        cutoff_time = datetime.now() - timedelta(days=max_age_days)
+        # 保留最新的 keep_count 个文件，其余文件无论是否超过最大保留天数都会删除
+        # （短时间内产生大量配置文件时，未过期的多余文件同样需要清理）
+        victims = sorted_paths[keep_count:]
+        expired_count = 0
+        for file_path in victims:
+            try:
+                if os.stat(file_path).st_mtime < cutoff_timestamp:
+                    expired_count += 1
+            except OSError:
+                pass
         
-        # 保留最新的 keep_count 个文件
-        files_to_keep = files_with_time[:keep_count]
-        files_to_check = files_with_time[keep_count:]
+        # 并行删除以隐藏慢速/网络文件系统上的 unlink 延迟
+        with ThreadPoolExecutor(max_workers=min(MAX_UNLINK_WORKERS, len(victims))) as executor:
+            results = list(executor.map(_safe_unlink, victims))
+        deleted_count = sum(results)
+        self.invalidate_cache()
         
-        # 删除超出保留数量且超过最大保留天数的文件
-        for file_path, mtime in files_to_check:
-            file_time = datetime.fromtimestamp(mtime)
-            
-            # 删除超过最大保留天数的文件
-            if file_time < cutoff_time:
-                try:
-                    os.remove(file_path)
-                    logger.debug(f"已删除旧配置文件: {os.path.basename(file_path)}")
-                    deleted_count += 1
-                except OSError as e:
-                    logger.error(f"删除文件 {file_path} 失败: {e}")
-            else:
-                # 如果文件还未超过最大保留天数，但超出了保留数量，也删除
-                # 这种情况通常发生在短时间内产生大量配置文件时
-                if len(files_with_time) - deleted_count > keep_count:
-                    try:
-                        os.remove(file_path)
-                        logger.debug(f"已删除多余配置文件: {os.path.basename(file_path)}")
-                        deleted_count += 1
-                    except OSError as e:
-                        logger.error(f"删除文件 {file_path} 失败: {e}")
+        if deleted_count < len(victims):
+            logger.error(f"删除配置历史文件失败: {len(victims) - deleted_count}/{len(victims)} 个")
         
         if deleted_count > 0:
-            logger.info(f"配置历史清理完成，删除了 {deleted_count} 个文件")
+            logger.info(f"配置历史清理完成，删除了 {deleted_count} 个文件（其中 {expired_count} 个已过期）")
             remaining_files = len(files) - deleted_count
             logger.info(f"剩余配置历史文件: {remaining_files} 个")
         else:
@@ -97,43 +152,24 @@ class ConfigHistoryCleanup:
         if not os.path.exists(self.config_history_dir):
             return {"total_files": 0, "total_size": 0, "oldest_file": None, "newest_file": None}
         
-        pattern = os.path.join(self.config_history_dir, 'config_*.json')
-        files = glob.glob(pattern)
+        files = self.list_history_files()
         
         if not files:
             return {"total_files": 0, "total_size": 0, "oldest_file": None, "newest_file": None}
         
-        total_size = 0
-        oldest_time = float('inf')
-        newest_time = 0
-        oldest_file = None
-        newest_file = None
-        
-        for file_path in files:
-            try:
-                stat = os.stat(file_path)
-                total_size += stat.st_size
-                mtime = stat.st_mtime
-                
-                if mtime < oldest_time:
-                    oldest_time = mtime
-                    oldest_file = os.path.basename(file_path)
-                
-                if mtime > newest_time:
-                    newest_time = mtime
-                    newest_file = os.path.basename(file_path)
-                    
-            except OSError:
-                continue
+        # 循环内只做求和与比较，文件名和日期只为最终结果格式化一次
+        total_size = sum(map(itemgetter(2), files))
+        oldest_path, oldest_time, _ = min(files, key=itemgetter(1))
+        newest_path, newest_time, _ = max(files, key=itemgetter(1))
         
         return {
             "total_files": len(files),
             "total_size": total_size,
             "total_size_mb": round(total_size / (1024 * 1024), 2),
-            "oldest_file": oldest_file,
-            "newest_file": newest_file,
-            "oldest_date": datetime.fromtimestamp(oldest_time).strftime("%Y-%m-%d %H:%M:%S") if oldest_time != float('inf') else None,
-            "newest_date": datetime.fromtimestamp(newest_time).strftime("%Y-%m-%d %H:%M:%S") if newest_time > 0 else None
+            "oldest_file": os.path.basename(oldest_path),
+            "newest_file": os.path.basename(newest_path),
+            "oldest_date": datetime.fromtimestamp(oldest_time).strftime("%Y-%m-%d %H:%M:%S"),
+            "newest_date": datetime.fromtimestamp(newest_time).strftime("%Y-%m-%d %H:%M:%S")
         }
 
 def main():
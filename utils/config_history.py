@@ -2,32 +2,36 @@
 # -*- coding: utf-8 -*-
 
 import os
-import json
 import time
 import difflib
 import shutil
 from datetime import datetime
+from heapq import nlargest
+from operator import itemgetter
+from utils import json_utils
 from utils.logger import get_logger
 from utils.config_manager import load_config, save_config, CONFIG_PATH
-from utils.config_cleanup import ConfigHistoryCleanup
+from utils.config_cleanup import ConfigHistoryCleanup, HISTORY_FILE_RE
 from utils.path_utils import (
+    get_user_history_path,
     get_user_history_dir,
     get_legacy_history_dir,
     migrate_legacy_directory,
 )
 
-_USER_HISTORY_DIR = get_user_history_dir()
-HISTORY_DIR = str(_USER_HISTORY_DIR)
+HISTORY_DIR = str(get_user_history_path())
 _LEGACY_HISTORY_DIR = get_legacy_history_dir()
 
 
 def _initialize_history_storage(logger):
-    migrated = migrate_legacy_directory(_LEGACY_HISTORY_DIR, _USER_HISTORY_DIR)
+    # 迁移需要在创建用户历史目录之前进行，才能直接重命名旧目录
+    migrated = migrate_legacy_directory(_LEGACY_HISTORY_DIR, get_user_history_path())
     if migrated:
         logger.info(f"已迁移配置历史到 {HISTORY_DIR}，备份路径: {migrated}")
+    return get_user_history_dir()
 
 
-_initialize_history_storage(get_logger("config_history_bootstrap"))
+_USER_HISTORY_DIR = _initialize_history_storage(get_logger("config_history_bootstrap"))
 
 class ConfigHistoryManager:
     """配置历史管理器，用于记录和管理配置文件的变更历史"""
@@ -68,10 +72,11 @@ class ConfigHistoryManager:
             }
             
             # 保存历史记录
-            with open(history_file, 'w', encoding='utf-8') as f:
-                json.dump(history_config, f, ensure_ascii=False, indent=2)
+            with open(history_file, 'wb') as f:
+                f.write(json_utils.dumps(history_config))
             
             self.logger.info(f"保存配置历史记录: {history_file}")
+            self.cleanup_manager.invalidate_cache()
             
             # 清理旧记录
             self.cleanup_old_histories()
@@ -82,40 +87,57 @@ class ConfigHistoryManager:
             return False, str(e)
     
     def get_history_list(self, limit=50):
-        """获取历史记录列表"""
+        """
+        获取历史记录列表
+
+        时间信息直接从文件名 config_YYYYMMDD_HHMMSS.json 解析，不读取文件内容；
+        描述字段为 None，需要时通过 get_history_description 单独获取。
+        """
         try:
-            history_files = []
-            
             # 确保目录存在
             if not os.path.exists(self.history_dir):
                 return []
             
-            # 遍历历史目录获取所有记录文件
-            for filename in os.listdir(self.history_dir):
-                if filename.startswith("config_") and filename.endswith(".json"):
-                    file_path = os.path.join(self.history_dir, filename)
+            # 遍历历史目录获取所有记录文件（目录未变化时复用缓存的列表）
+            entries = []
+            for file_path in self.cleanup_manager.list_history_paths():
+                filename = os.path.basename(file_path)
+                try:
+                    timestamp = int(datetime.strptime(
+                        HISTORY_FILE_RE.fullmatch(filename).group(1), "%Y%m%d_%H%M%S"
+                    ).timestamp())
+                except ValueError:
+                    # 文件名中的日期无效时退回到文件修改时间
                     try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            history_data = json.load(f)
-                            history_files.append({
-                                "filename": filename,
-                                "path": file_path,
-                                "timestamp": history_data.get("timestamp", 0),
-                                "date": history_data.get("date", "未知"),
-                                "description": history_data.get("description", "")
-                            })
-                    except Exception as e:
-                        self.logger.error(f"读取历史记录失败 {filename}: {e}")
-            
-            # 按时间戳排序（最新的在前）
-            history_files.sort(key=lambda x: x["timestamp"], reverse=True)
-            
-            # 限制返回数量
-            return history_files[:limit]
+                        timestamp = int(os.path.getmtime(file_path))
+                    except OSError:
+                        continue
+                entries.append((timestamp, filename, file_path))
+            
+            # 只取最新的 limit 条（按时间戳从新到旧），其余记录不再构造字典
+            return [
+                {
+                    "filename": filename,
+                    "path": file_path,
+                    "timestamp": timestamp,
+                    "date": datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S"),
+                    "description": None
+                }
+                for timestamp, filename, file_path in nlargest(limit, entries, key=itemgetter(0))
+            ]
         except Exception as e:
             self.logger.error(f"获取历史记录列表失败: {e}")
             return []
     
+    def get_history_description(self, filename):
+        """获取指定历史记录的描述，读取失败时返回空字符串"""
+        try:
+            with open(os.path.join(self.history_dir, filename), 'rb') as f:
+                return json_utils.loads(f.read()).get("description", "")
+        except Exception as e:
+            self.logger.error(f"读取历史记录描述失败 {filename}: {e}")
+            return ""
+    
     def get_history_content(self, filename):
         """获取指定历史记录的内容"""
         try:
@@ -124,27 +146,41 @@ class ConfigHistoryManager:
             if not os.path.exists(file_path):
                 return None, f"历史记录文件不存在: {filename}"
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                history_data = json.load(f)
+            with open(file_path, 'rb') as f:
+                history_data = json_utils.loads(f.read())
                 return history_data, None
         except Exception as e:
             self.logger.error(f"获取历史记录内容失败: {e}")
             return None, f"读取历史记录失败: {str(e)}"
     
     def compare_configs(self, config1, config2):
-        """比较两个配置文件的差异"""
+        """
+        比较两个配置文件的差异
+
+        返回的行沿用 Differ 的 "  "/"- "/"+ " 前缀，但不包含 Differ 的 "? " 逐字符提示行，
+        替换块先输出全部删除行再输出全部新增行。
+        """
         try:
             # 将配置转换为格式化的JSON字符串
-            config1_str = json.dumps(config1, ensure_ascii=False, indent=2, sort_keys=True)
-            config2_str = json.dumps(config2, ensure_ascii=False, indent=2, sort_keys=True)
+            config1_str = json_utils.dumps(config1, sort_keys=True).decode('utf-8')
+            config2_str = json_utils.dumps(config2, sort_keys=True).decode('utf-8')
             
             # 拆分为行
             config1_lines = config1_str.splitlines()
             config2_lines = config2_str.splitlines()
             
-            # 使用difflib比较差异
-            differ = difflib.Differ()
-            diff = list(differ.compare(config1_lines, config2_lines))
+            # 按匹配块输出差异，保持 Differ 的 "  "/"- "/"+ " 前缀格式；
+            # 不再做 Differ 的逐字符比对（"? " 提示行），替换块直接输出删除行和新增行
+            matcher = difflib.SequenceMatcher(None, config1_lines, config2_lines)
+            diff = []
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                if tag == 'equal':
+                    diff.extend('  ' + line for line in config1_lines[i1:i2])
+                    continue
+                if tag in ('replace', 'delete'):
+                    diff.extend('- ' + line for line in config1_lines[i1:i2])
+                if tag in ('replace', 'insert'):
+                    diff.extend('+ ' + line for line in config2_lines[j1:j2])
             
             return diff
         except Exception as e:
@@ -2,13 +2,17 @@
 # -*- coding: utf-8 -*-
 
 import os
-import json
+import sys
+import atexit
+import copy
+import hashlib
+import mmap
 import time
 import threading
 from typing import Dict, Any, Optional, List
+from utils import json_utils
 from utils.logger import get_logger
 from utils.path_utils import (
-    get_project_root,
     get_user_config_path,
     get_legacy_config_path,
     migrate_legacy_file,
@@ -17,8 +21,6 @@ from utils.path_utils import (
 # 获取日志记录器
 logger = get_logger("config_manager")
 
-# 获取项目根目录
-PROJECT_ROOT = str(get_project_root())
 _USER_CONFIG_PATH = get_user_config_path()
 CONFIG_PATH = str(_USER_CONFIG_PATH)
 _LEGACY_CONFIG_PATH = get_legacy_config_path()
@@ -32,71 +34,148 @@ def _initialize_config_storage():
 
 _initialize_config_storage()
 
-# 项目路径配置完成
-
 # 全局变量
 _config_cache: Optional[Dict[str, Any]] = None
-_last_save_time = 0
-_save_timer = None
-_save_lock = threading.Lock()
+_config_cache_key: Optional[tuple] = None  # 缓存对应的配置文件 (inode, mtime_ns, size)，文件不存在时为 None
+_config_file_digest: Optional[bytes] = None  # 缓存键对应的配置文件内容摘要，用于跳过内容相同的保存
+_save_lock = threading.Lock()  # 保护待写入配置和落盘时间，只在内存操作期间持有
+_save_cond = threading.Condition(_save_lock)
+# 按排队号串行化实际的磁盘写入：排队号在持有 _save_lock 时领取以保证写入顺序，
+# 等待期间释放 _save_lock，写入完成后可以在 _save_lock 内更新缓存而不会死锁
+_write_next_ticket = 0
+_write_now_serving = 0
+_pending_config: Optional[Dict[str, Any]] = None  # 等待后台线程写入的配置（save_config 调用时复制的顶层快照）
+_save_deadline = 0.0  # 待写入配置的落盘时间（time.monotonic）
+_writer_thread: Optional[threading.Thread] = None
 SAVE_DELAY = 1.0  # 延迟保存时间（秒）
 DEFAULT_ICON_CACHE_CAPACITY = 128
 DEFAULT_TOGGLE_HOTKEY = "alt+w"
 DEFAULT_ENABLE_HOTKEY = True
+# 用户目录中没有配置文件时使用的默认配置
+_DEFAULT_CONFIG = {"categories": ["娱乐", "工作", "文档"], "programs": []}
+MMAP_READ_THRESHOLD = 64 * 1024  # 超过该大小的配置文件使用内存映射读取
+# 默认的本地专用键（不参与同步）
+_DEFAULT_LOCAL_ONLY_KEYS = (
+    "tag_filter_state",     # 标签过滤状态保持本地
+    "window_size",          # 窗口大小本地化
+    "device_window_sizes",  # 设备特定窗口大小
+    "sync_settings",        # 同步设置本身也不同步
+)
+_DEFAULT_LOCAL_ONLY_KEY_SET = frozenset(_DEFAULT_LOCAL_ONLY_KEYS)
+
+
+def _digest(data) -> bytes:
+    """计算配置文件内容摘要"""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _read_config_file(path: str):
+    """
+    读取并解析配置文件，大文件通过内存映射直接交给解析器，避免额外的字节拷贝
+
+    Returns:
+        (配置字典, 文件内容摘要)
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size > MMAP_READ_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                return json_utils.loads(view), _digest(view)
+        data = f.read()
+        return json_utils.loads(data), _digest(data)
+
+
+def _config_file_key() -> Optional[tuple]:
+    """获取配置文件的缓存键，文件不存在时返回 None"""
+    try:
+        st = os.stat(CONFIG_PATH)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
 
 def load_config() -> Dict[str, Any]:
-    """加载配置文件（使用缓存）"""
-    global _config_cache
+    """
+    加载配置文件（使用缓存）
+
+    返回的字典即缓存本身，不做拷贝；修改后应通过 save_config 保存。
+    save_config 会复制顶层作为待写入的快照，之后替换顶层键（如重建 programs 列表）不会影响写入的内容。
+    """
+    global _config_cache, _config_cache_key, _config_file_digest
+    
+    try:
+        key = _config_file_key()
+    except OSError as e:
+        logger.error(f"加载配置失败: {e}")
+        return copy.deepcopy(_DEFAULT_CONFIG)
     
     # 如果有缓存且文件未变更，返回缓存
-    if _config_cache is not None:
-        try:
-            if os.path.exists(CONFIG_PATH):
-                file_mtime = os.path.getmtime(CONFIG_PATH)
-                cache_mtime = _config_cache.get('_cache_time', 0)
-                if file_mtime <= cache_mtime:
-                    # 返回不包含缓存元数据的配置
-                    return {k: v for k, v in _config_cache.items() if not k.startswith('_cache')}
-        except OSError:
-            pass
+    if _config_cache is not None and key == _config_cache_key:
+        return _config_cache
     
+    digest = None
     try:
-        if os.path.exists(CONFIG_PATH):
-            with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            # 添加缓存时间戳
-            _config_cache = config.copy()
-            _config_cache['_cache_time'] = time.time()
-            return config
+        if key is not None:
+            config, digest = _read_config_file(CONFIG_PATH)
         else:
-            default_config = {"categories": ["娱乐", "工作", "文档"], "programs": []}
-            _config_cache = default_config.copy()
-            _config_cache['_cache_time'] = time.time()
-            return default_config
+            config = copy.deepcopy(_DEFAULT_CONFIG)
     except Exception as e:
         logger.error(f"加载配置失败: {e}")
-        default_config = {"categories": ["娱乐", "工作", "文档"], "programs": []}
-        _config_cache = default_config.copy()
-        _config_cache['_cache_time'] = time.time()
-        return default_config
+        config = copy.deepcopy(_DEFAULT_CONFIG)
+    
+    _config_cache = config
+    _config_cache_key = key
+    _config_file_digest = digest
+    return config
+
+def _fsync_directory(path: str):
+    """同步目录项，使 rename 在崩溃后依然有效（仅 POSIX 支持打开目录）"""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    try:
+        dir_fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
 
 def _do_save_config(config: Dict[str, Any]) -> bool:
-    """实际执行保存操作"""
+    """实际执行保存操作；缓存的配置已由 save_config 更新，这里只更新缓存键"""
+    global _config_cache_key, _config_file_digest
     try:
+        data = json_utils.dumps(config)
+        digest = _digest(data)
+        
+        # 内容与磁盘上的文件相同且文件未被外部修改时跳过写入
+        if (digest == _config_file_digest and _config_cache_key is not None
+                and _config_file_key() == _config_cache_key):
+            return True
+        
         # 原子写入，先写临时文件再重命名
         temp_path = CONFIG_PATH + '.tmp'
-        with open(temp_path, 'w', encoding='utf-8') as f:
-            json.dump(config, f, ensure_ascii=False, indent=2)
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o600)
+        try:
+            # 绕过缓冲文件对象直接写入，通常一次系统调用即可写完
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            # 替换前先落盘，避免崩溃后出现内容为空的配置文件
+            os.fsync(fd)
+        finally:
+            os.close(fd)
         
-        # 重命名为正式文件
-        if os.path.exists(CONFIG_PATH):
-            os.remove(CONFIG_PATH)
-        os.rename(temp_path, CONFIG_PATH)
+        # 原子替换正式文件，读取方不会看到配置文件缺失的中间状态
+        os.replace(temp_path, CONFIG_PATH)
+        _fsync_directory(os.path.dirname(CONFIG_PATH))
         
-        # 更新缓存
-        global _config_cache
-        _config_cache = config.copy()
-        _config_cache['_cache_time'] = time.time()
+        # 更新缓存键，与 save_config 对缓存的修改同在 _save_lock 内进行；
+        # 调用方此时已轮到写入，不会持有 _save_lock 等待
+        file_key = _config_file_key()
+        with _save_lock:
+            _config_cache_key = file_key
+            _config_file_digest = digest
         
         return True
     except Exception as e:
@@ -110,34 +189,76 @@ def _do_save_config(config: Dict[str, Any]) -> bool:
                 pass
         return False
 
+def _begin_write():
+    """领取写入排队号并等待轮到自己，调用时必须持有 _save_lock"""
+    global _write_next_ticket
+    ticket = _write_next_ticket
+    _write_next_ticket += 1
+    while _write_now_serving != ticket:
+        _save_cond.wait()
+
+def _end_write():
+    """结束本次写入，唤醒下一个排队的写入方"""
+    global _write_now_serving
+    with _save_cond:
+        _write_now_serving += 1
+        _save_cond.notify_all()
+
+def _writer_loop():
+    """后台写入线程：等到最后一次保存请求后 SAVE_DELAY 秒再落盘，一次连续修改只写一次"""
+    global _pending_config
+    while True:
+        with _save_cond:
+            while True:
+                if _pending_config is None:
+                    # 已被 _shutdown_writer 停用的写入线程在没有待写入配置时退出
+                    if _writer_thread is not threading.current_thread():
+                        return
+                    _save_cond.wait()
+                    continue
+                remaining = _save_deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                _save_cond.wait(remaining)
+            config = _pending_config
+            _pending_config = None
+            _begin_write()
+        # 序列化和写入磁盘都在后台线程中进行，且不持有 _save_lock，期间的 save_config 调用不会被阻塞
+        try:
+            _do_save_config(config)
+        finally:
+            _end_write()
+
 def save_config(config: Dict[str, Any], immediate: bool = False) -> bool:
-    """保存配置文件（支持延迟保存）"""
-    global _save_timer, _last_save_time
+    """
+    保存配置文件（支持延迟保存）
+
+    延迟保存只复制配置的顶层作为快照，序列化由后台线程完成，不占用调用线程。
+    """
+    global _config_cache, _pending_config, _save_deadline, _writer_thread
     
-    if immediate:
-        # 立即保存
-        with _save_lock:
-            if _save_timer:
-                _save_timer.cancel()
-                _save_timer = None
-            return _do_save_config(config)
-    else:
-        # 延迟保存
-        with _save_lock:
-            # 取消之前的定时器
-            if _save_timer:
-                _save_timer.cancel()
-            
-            # 更新缓存中的配置
-            global _config_cache
-            _config_cache = config.copy()
-            _config_cache['_cache_time'] = time.time()
-            
-            # 设置新的定时器
-            _save_timer = threading.Timer(SAVE_DELAY, lambda: _do_save_config(config))
-            _save_timer.start()
+    with _save_lock:
+        # 缓存保持为调用方的字典，缓存键保持不变，保存完成前 load_config 返回该配置
+        _config_cache = config
+        if immediate:
+            # 立即保存，丢弃尚未写入的旧配置
+            _pending_config = None
+            _begin_write()
+        else:
+            # 延迟保存：调用方之后替换顶层键不会影响待写入的快照
+            _pending_config = dict(config)
+            _save_deadline = time.monotonic() + SAVE_DELAY
             
-        return True
+            if _writer_thread is None:
+                _writer_thread = threading.Thread(target=_writer_loop, name="config-writer", daemon=True)
+                _writer_thread.start()
+            _save_cond.notify_all()
+            return True
+    
+    try:
+        return _do_save_config(config)
+    finally:
+        _end_write()
 
 
 def ensure_hotkey_defaults(config: Dict[str, Any], persist: bool = False) -> Dict[str, Any]:
@@ -169,20 +290,36 @@ def ensure_hotkey_defaults(config: Dict[str, Any], persist: bool = False) -> Dic
 
 def flush_config():
     """强制刷新所有待保存的配置"""
-    global _save_timer
+    global _pending_config
     with _save_lock:
-        if _save_timer:
-            _save_timer.cancel()
-            _save_timer = None
-            if _config_cache:
-                config_to_save = {k: v for k, v in _config_cache.items() if not k.startswith('_cache')}
-                return _do_save_config(config_to_save)
-    return True
+        config = _pending_config
+        _pending_config = None
+        # 同时等待后台线程正在进行的写入完成
+        _begin_write()
+    try:
+        if config is not None:
+            return _do_save_config(config)
+        return True
+    finally:
+        _end_write()
+
+def _shutdown_writer():
+    """写入尚未落盘的延迟保存并让后台写入线程退出；之后的延迟保存会重新启动写入线程"""
+    global _writer_thread
+    flush_config()
+    with _save_cond:
+        _writer_thread = None
+        _save_cond.notify_all()
+
+# 后台写入线程是守护线程，退出时先把尚未落盘的延迟保存写入磁盘
+atexit.register(_shutdown_writer)
 
 def clear_config_cache():
     """清空配置缓存"""
-    global _config_cache
+    global _config_cache, _config_cache_key, _config_file_digest
     _config_cache = None
+    _config_cache_key = None
+    _config_file_digest = None
 
 def get_programs(config: Dict[str, Any]) -> list:
     """
@@ -233,6 +370,15 @@ def get_ui_preferences(config: Dict[str, Any]) -> Dict[str, Any]:
     prefs = config.get("ui_preferences")
     return prefs if isinstance(prefs, dict) else {}
 
+def _ensure_ui_preferences(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    获取可直接修改的界面偏好设置字典，不存在或格式无效时创建
+    """
+    prefs = config.get("ui_preferences")
+    if not isinstance(prefs, dict):
+        prefs = config["ui_preferences"] = {}
+    return prefs
+
 def is_launch_icon_enabled(config: Dict[str, Any]) -> bool:
     """
     返回是否启用启动项图标渲染
@@ -244,9 +390,7 @@ def set_launch_icon_enabled(config: Dict[str, Any], enabled: bool) -> Dict[str,
     """
     更新启动项图标开关
     """
-    prefs = get_ui_preferences(config).copy()
-    prefs["launch_icons_enabled"] = bool(enabled)
-    config["ui_preferences"] = prefs
+    _ensure_ui_preferences(config)["launch_icons_enabled"] = bool(enabled)
     return config
 
 def get_icon_cache_capacity(config: Dict[str, Any]) -> int:
@@ -265,13 +409,11 @@ def set_icon_cache_capacity(config: Dict[str, Any], capacity: int) -> Dict[str,
     """
     设置图标缓存容量
     """
-    prefs = get_ui_preferences(config).copy()
     try:
         normalized = max(16, int(capacity))
     except (TypeError, ValueError):
         normalized = DEFAULT_ICON_CACHE_CAPACITY
-    prefs["icon_cache_capacity"] = normalized
-    config["ui_preferences"] = prefs
+    _ensure_ui_preferences(config)["icon_cache_capacity"] = normalized
     return config
 
 def get_tag_filter_state(config: Dict[str, Any]) -> Dict[str, Any]:
@@ -330,20 +472,12 @@ def filter_programs_by_tags(config: Dict[str, Any], programs: list = None) -> li
     if not selected_tags:
         return programs
     
-    filtered_programs = []
-    for program in programs:
-        program_tags = program.get("tags", [])
-        
-        if filter_mode == "AND":
-            # AND模式：程序必须包含所有选中的标签
-            if all(tag in program_tags for tag in selected_tags):
-                filtered_programs.append(program)
-        else:
-            # OR模式：程序包含任一选中标签即可
-            if any(tag in program_tags for tag in selected_tags):
-                filtered_programs.append(program)
-    
-    return filtered_programs
+    selected_set = frozenset(selected_tags)
+    if filter_mode == "AND":
+        # AND模式：程序必须包含所有选中的标签
+        return [p for p in programs if selected_set.issubset(p.get("tags", ()))]
+    # OR模式：程序包含任一选中标签即可
+    return [p for p in programs if not selected_set.isdisjoint(p.get("tags", ()))]
 
 def prepare_config_for_sync(config: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -355,54 +489,40 @@ def prepare_config_for_sync(config: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         用于同步的配置数据（排除了本地特定设置）
     """
-    # 创建配置副本
-    sync_config = config.copy()
-    
     # 从配置中读取本地专用键列表，如果没有则使用默认值
     sync_settings = config.get("sync_settings", {})
-    local_only_keys = sync_settings.get("local_only_keys", [
-        "tag_filter_state",  # 标签过滤状态保持本地
-        "window_size",       # 窗口大小本地化
-        "device_window_sizes",  # 设备特定窗口大小
-        "sync_settings"      # 同步设置本身也不同步
-    ])
-    
-    # 排除本地专用设置
-    for key in local_only_keys:
-        if key in sync_config:
-            del sync_config[key]
+    if "local_only_keys" in sync_settings:
+        local_only_keys = frozenset(sync_settings["local_only_keys"])
+    else:
+        local_only_keys = _DEFAULT_LOCAL_ONLY_KEY_SET
     
-    return sync_config
+    # 一次遍历构建不含本地专用设置的配置
+    return {key: value for key, value in config.items() if key not in local_only_keys}
 
 def merge_synced_config(local_config: Dict[str, Any], synced_config: Dict[str, Any]) -> Dict[str, Any]:
     """
     合并同步的配置与本地配置
     
+    以同步配置为基础，直接在 synced_config 上写入本地特定设置并返回它，不再复制一份；
+    调用方传入的都是刚从远程解析出的配置。local_config 不会被修改。
+    
     Args:
         local_config: 本地配置数据
-        synced_config: 从远程同步的配置数据
+        synced_config: 从远程同步的配置数据（会被原地修改）
         
     Returns:
-        合并后的配置数据
+        合并后的配置数据（即 synced_config 本身）
     """
-    # 以同步配置为基础
-    merged_config = synced_config.copy()
-    
     # 从本地配置中读取本地专用键列表
     sync_settings = local_config.get("sync_settings", {})
-    local_only_keys = sync_settings.get("local_only_keys", [
-        "tag_filter_state",  # 保持本地的标签过滤状态
-        "window_size",       # 保持本地的窗口大小
-        "device_window_sizes",  # 保持设备特定窗口大小
-        "sync_settings"      # 同步设置本身也保持本地
-    ])
+    local_only_keys = sync_settings.get("local_only_keys", _DEFAULT_LOCAL_ONLY_KEYS)
     
     # 保留本地特定的设置
     for key in local_only_keys:
         if key in local_config:
-            merged_config[key] = local_config[key]
+            synced_config[key] = local_config[key]
     
-    return merged_config
+    return synced_config
 
 def get_local_only_keys(config: Dict[str, Any]) -> list:
     """
@@ -415,12 +535,10 @@ def get_local_only_keys(config: Dict[str, Any]) -> list:
         本地专用键列表
     """
     sync_settings = config.get("sync_settings", {})
-    return sync_settings.get("local_only_keys", [
-        "tag_filter_state",
-        "window_size", 
-        "device_window_sizes",
-        "sync_settings"
-    ])
+    if "local_only_keys" in sync_settings:
+        return sync_settings["local_only_keys"]
+    # 返回新列表，调用方（如 add_local_only_key）会直接修改它
+    return list(_DEFAULT_LOCAL_ONLY_KEYS)
 
 def set_local_only_keys(config: Dict[str, Any], keys: list) -> Dict[str, Any]:
     """
@@ -483,35 +601,33 @@ def print_sync_config_info(config: Dict[str, Any] = None):
     if config is None:
         config = load_config()
     
-    print("🔧 同步配置信息")
-    print("=" * 50)
+    lines = ["🔧 同步配置信息", "=" * 50]
     
     # 显示当前的本地专用键
     local_only_keys = get_local_only_keys(config)
-    print(f"📋 本地专用键 ({len(local_only_keys)} 个):")
-    for i, key in enumerate(local_only_keys, 1):
-        print(f"   {i}. {key}")
+    lines.append(f"📋 本地专用键 ({len(local_only_keys)} 个):")
+    lines.extend(f"   {i}. {key}" for i, key in enumerate(local_only_keys, 1))
     
-    print("\n" + "=" * 50)
+    lines.append("\n" + "=" * 50)
     
     # 显示将要同步的配置项
     sync_config = prepare_config_for_sync(config)
-    print(f"☁️  将要同步的配置项 ({len(sync_config)} 个):")
-    for i, key in enumerate(sync_config.keys(), 1):
-        print(f"   {i}. {key}")
+    lines.append(f"☁️  将要同步的配置项 ({len(sync_config)} 个):")
+    lines.extend(f"   {i}. {key}" for i, key in enumerate(sync_config.keys(), 1))
     
-    print("\n" + "=" * 50)
+    lines.append("\n" + "=" * 50)
     
     # 显示本地保留的配置项
     local_keys = set(config.keys()) - set(sync_config.keys())
-    print(f"🏠 本地保留的配置项 ({len(local_keys)} 个):")
-    for i, key in enumerate(sorted(local_keys), 1):
-        print(f"   {i}. {key}")
+    lines.append(f"🏠 本地保留的配置项 ({len(local_keys)} 个):")
+    lines.extend(f"   {i}. {key}" for i, key in enumerate(sorted(local_keys), 1))
+    
+    lines.append("\n✅ 配置信息显示完成！")
     
-    print("\n✅ 配置信息显示完成！")
+    # 一次性输出，避免逐行 print
+    sys.stdout.write("\n".join(lines) + "\n")
 
 # 命令行调用支持
 if __name__ == "__main__":
-    import sys
     if len(sys.argv) > 1 and sys.argv[1] == "sync-info":
         print_sync_config_info()
@@ -3,10 +3,11 @@
 
 import base64
 import os
-import json
-from cryptography.fernet import Fernet
+from functools import lru_cache
+from cryptography.fernet import Fernet, InvalidToken
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from utils import json_utils
 from utils.logger import get_logger
 from utils.path_utils import (
     get_user_credentials_path,
@@ -19,57 +20,96 @@ _USER_CREDENTIALS_PATH = get_user_credentials_path()
 _LEGACY_CREDENTIALS_PATH = get_legacy_credentials_path()
 migrate_legacy_file(_LEGACY_CREDENTIALS_PATH, _USER_CREDENTIALS_PATH)
 
+# 解密结果缓存：(凭证文件路径, 服务名) -> (文件标识, (用户名, 密码))。
+# 各同步管理器每次都会新建 CredentialManager，因此缓存放在模块级别
+_credential_cache = {}
+
+
+def _credentials_file_key(path: str) -> tuple:
+    """凭证文件的标识（inode、修改时间、大小），文件被其他进程改写后随之变化"""
+    st = os.stat(path)
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def _invalidate_credential_cache(path: str):
+    for key in [key for key in _credential_cache if key[0] == path]:
+        _credential_cache.pop(key, None)
+
+
+@lru_cache(maxsize=1)
+def _get_machine_id() -> str:
+    """获取机器唯一标识符（进程内不会变化，只获取一次）"""
+    try:
+        # Windows
+        if os.name == 'nt':
+            import subprocess
+            try:
+                result = subprocess.run(['wmic', 'csproduct', 'get', 'uuid'], 
+                                     capture_output=True, text=True)
+                if result.returncode == 0:
+                    lines = result.stdout.strip().split('\n')
+                    if len(lines) > 1:
+                        return lines[1].strip()
+            except OSError:
+                # 新版 Windows 已移除 wmic
+                pass
+            
+            # 回退到注册表中的 MachineGuid，无需启动子进程
+            import winreg
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Cryptography") as key:
+                return winreg.QueryValueEx(key, "MachineGuid")[0]
+        
+        # macOS/Linux - 使用机器ID
+        machine_id_paths = ['/etc/machine-id', '/var/lib/dbus/machine-id']
+        for path in machine_id_paths:
+            if os.path.exists(path):
+                with open(path, 'r') as f:
+                    return f.read().strip()
+        
+        # 回退到用户目录路径作为标识
+        return str(hash(os.path.expanduser('~')))
+        
+    except Exception as e:
+        logger.warning(f"无法获取机器ID: {e}")
+        # 使用用户目录路径的哈希值作为回退
+        return str(hash(os.path.expanduser('~')))
+
+
+@lru_cache(maxsize=4)
+def _pbkdf2_key(password: str, salt: bytes) -> bytes:
+    """PBKDF2 派生密钥（约十万次迭代），相同密码和盐值在进程内只计算一次"""
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=100000,
+    )
+    return base64.urlsafe_b64encode(kdf.derive(password.encode()))
+
+
 class CredentialManager:
     """安全凭证管理器 - 加密存储敏感信息"""
     
     def __init__(self, config_path: str = None):
         self.config_path = config_path or str(_USER_CREDENTIALS_PATH)
         self.key = None
+        self._fernet = None
         
     def _derive_key(self, password: str, salt: bytes = None) -> bytes:
         """从密码派生加密密钥"""
         if salt is None:
             salt = os.urandom(16)
-        
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
-        return key, salt
+        return _pbkdf2_key(password, salt), salt
     
     def _get_machine_id(self) -> str:
         """获取机器唯一标识符"""
-        try:
-            # Windows
-            if os.name == 'nt':
-                import subprocess
-                result = subprocess.run(['wmic', 'csproduct', 'get', 'uuid'], 
-                                     capture_output=True, text=True)
-                if result.returncode == 0:
-                    lines = result.stdout.strip().split('\n')
-                    if len(lines) > 1:
-                        return lines[1].strip()
-            
-            # macOS/Linux - 使用机器ID
-            machine_id_paths = ['/etc/machine-id', '/var/lib/dbus/machine-id']
-            for path in machine_id_paths:
-                if os.path.exists(path):
-                    with open(path, 'r') as f:
-                        return f.read().strip()
-            
-            # 回退到用户目录路径作为标识
-            return str(hash(os.path.expanduser('~')))
-            
-        except Exception as e:
-            logger.warning(f"无法获取机器ID: {e}")
-            # 使用用户目录路径的哈希值作为回退
-            return str(hash(os.path.expanduser('~')))
+        return _get_machine_id()
     
     def _init_encryption(self) -> Fernet:
-        """初始化加密器"""
+        """初始化加密器（密钥派生开销较大，结果缓存在实例上）"""
+        if self._fernet is not None:
+            return self._fernet
+        
         if self.key is None:
             # 使用机器ID作为密码基础
             machine_id = self._get_machine_id()
@@ -78,7 +118,7 @@ class CredentialManager:
             if os.path.exists(self.config_path):
                 # 读取现有的盐值
                 with open(self.config_path, 'rb') as f:
-                    data = json.loads(f.read().decode('utf-8'))
+                    data = json_utils.loads(f.read())
                     salt = base64.b64decode(data.get('salt', ''))
                     self.key, _ = self._derive_key(password, salt)
             else:
@@ -87,28 +127,33 @@ class CredentialManager:
                 # 保存盐值
                 with open(self.config_path, 'wb') as f:
                     data = {'salt': base64.b64encode(salt).decode('utf-8'), 'credentials': {}}
-                    f.write(json.dumps(data, indent=2).encode('utf-8'))
+                    f.write(json_utils.dumps(data, indent=False))
         
-        return Fernet(self.key)
+        self._fernet = Fernet(self.key)
+        return self._fernet
     
     def store_credential(self, service: str, username: str, password: str) -> bool:
         """存储加密的凭证"""
         try:
             fernet = self._init_encryption()
             
-            # 加密密码
-            encrypted_password = fernet.encrypt(password.encode()).decode()
-            
             # 读取现有数据
             credentials = {}
             if os.path.exists(self.config_path):
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                with open(self.config_path, 'rb') as f:
+                    data = json_utils.loads(f.read())
                     credentials = data.get('credentials', {})
                     salt = data.get('salt', '')
             else:
                 salt = base64.b64encode(os.urandom(16)).decode('utf-8')
             
+            # 凭证未变化时不重写文件（Fernet 加密结果每次都不同，只能解密后比较）
+            if self._matches_stored(fernet, credentials.get(service), username, password):
+                return True
+            
+            # 加密密码
+            encrypted_password = fernet.encrypt(password.encode()).decode()
+            
             # 存储凭证
             credentials[service] = {
                 'username': username,
@@ -116,12 +161,13 @@ class CredentialManager:
             }
             
             # 写回文件
-            with open(self.config_path, 'w', encoding='utf-8') as f:
+            with open(self.config_path, 'wb') as f:
                 data = {
                     'salt': salt,
                     'credentials': credentials
                 }
-                json.dump(data, f, indent=2)
+                f.write(json_utils.dumps(data, indent=False))
+            _invalidate_credential_cache(self.config_path)
             
             logger.info(f"已安全存储 {service} 的凭证")
             return True
@@ -130,31 +176,49 @@ class CredentialManager:
             logger.error(f"存储凭证失败: {e}")
             return False
     
+    @staticmethod
+    def _matches_stored(fernet: Fernet, cred, username: str, password: str) -> bool:
+        """判断已存储的凭证是否与给定的用户名和密码相同"""
+        if not cred or cred.get('username') != username or not cred.get('password'):
+            return False
+        try:
+            return fernet.decrypt(cred['password'].encode()).decode() == password
+        except InvalidToken:
+            return False
+    
     def get_credential(self, service: str) -> tuple:
-        """获取解密的凭证"""
+        """获取解密的凭证（凭证文件未变化时直接返回上次解密的结果）"""
         try:
-            if not os.path.exists(self.config_path):
+            try:
+                file_key = _credentials_file_key(self.config_path)
+            except FileNotFoundError:
                 return None, None
             
+            cache_key = (self.config_path, service)
+            cached = _credential_cache.get(cache_key)
+            if cached is not None and cached[0] == file_key:
+                return cached[1]
+            
             fernet = self._init_encryption()
             
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(self.config_path, 'rb') as f:
+                data = json_utils.loads(f.read())
                 credentials = data.get('credentials', {})
             
-            if service not in credentials:
-                return None, None
-            
-            cred = credentials[service]
-            username = cred.get('username')
-            encrypted_password = cred.get('password')
-            
-            if encrypted_password:
-                # 解密密码
-                password = fernet.decrypt(encrypted_password.encode()).decode()
-                return username, password
+            result = None, None
+            if service in credentials:
+                cred = credentials[service]
+                username = cred.get('username')
+                encrypted_password = cred.get('password')
+                
+                if encrypted_password:
+                    # 解密密码
+                    result = username, fernet.decrypt(encrypted_password.encode()).decode()
+                else:
+                    result = username, None
             
-            return username, None
+            _credential_cache[cache_key] = (file_key, result)
+            return result
             
         except Exception as e:
             logger.error(f"获取凭证失败: {e}")
@@ -166,15 +230,16 @@ class CredentialManager:
             if not os.path.exists(self.config_path):
                 return True
             
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(self.config_path, 'rb') as f:
+                data = json_utils.loads(f.read())
             
             credentials = data.get('credentials', {})
             if service in credentials:
                 del credentials[service]
                 
-                with open(self.config_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2)
+                with open(self.config_path, 'wb') as f:
+                    f.write(json_utils.dumps(data, indent=False))
+                _invalidate_credential_cache(self.config_path)
                 
                 logger.info(f"已删除 {service} 的凭证")
             
@@ -190,8 +255,8 @@ class CredentialManager:
             if not os.path.exists(self.config_path):
                 return []
             
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(self.config_path, 'rb') as f:
+                data = json_utils.loads(f.read())
                 credentials = data.get('credentials', {})
                 return list(credentials.keys())
                 
@@ -1,17 +1,23 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import requests
-import json
+from utils import json_utils
+from utils.http_utils import get_session, REQUEST_TIMEOUT
 from utils.logger import get_logger
 from utils.config_manager import load_config, save_config, prepare_config_for_sync, merge_synced_config
 
+# 条件请求缓存：(gist_id, 文件名) -> (ETag, 文件内容)。
+# 每次同步都会新建 GistManager，因此缓存放在模块级别
+_etag_cache = {}
+
 class GistManager:
     """GitHub Gist 管理器，用于将配置同步到 GitHub Gist"""
     
     def __init__(self):
         self.logger = get_logger()
         self.base_url = "https://api.github.com"
+        # 共享的 HTTP 会话，连续的同步请求复用同一个 keep-alive 连接
+        self.session = get_session()
         # 从配置中读取 GitHub 相关设置
         config = load_config()
         self.github_config = config.get("github_sync", {})
@@ -57,9 +63,10 @@ class GistManager:
         
         try:
             # 测试 API 连接
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/gists/{self.gist_id}", 
-                headers=self.get_headers()
+                headers=self.get_headers(),
+                timeout=REQUEST_TIMEOUT
             )
             
             if response.status_code == 200:
@@ -89,30 +96,25 @@ class GistManager:
             # 准备用于同步的配置（排除本地特定设置）
             sync_config = prepare_config_for_sync(config)
             
-            # 检查 Gist 是否存在
-            response = requests.get(
-                f"{self.base_url}/gists/{self.gist_id}", 
-                headers=self.get_headers()
-            )
-            
-            if response.status_code != 200:
-                return False, f"获取 Gist 失败: {response.status_code}"
-            
-            # 准备更新数据
-            gist_data = response.json()
+            # 准备更新数据（直接 PATCH，不再预先 GET 检查 Gist 是否存在）
             files_data = {}
-            files_data[self.filename] = {"content": json.dumps(sync_config, ensure_ascii=False, indent=2)}
+            files_data[self.filename] = {"content": json_utils.dumps(sync_config, indent=False).decode('utf-8')}
             
             # 更新 Gist
             update_data = {"files": files_data}
-            update_response = requests.patch(
+            update_response = self.session.patch(
                 f"{self.base_url}/gists/{self.gist_id}",
                 headers=self.get_headers(),
-                json=update_data
+                json=update_data,
+                timeout=REQUEST_TIMEOUT
             )
             
             if update_response.status_code == 200:
                 return True, "配置已成功上传到 GitHub Gist"
+            elif update_response.status_code == 401:
+                return False, "认证失败，请检查 Token"
+            elif update_response.status_code == 404:
+                return False, "未找到 Gist，请检查 Gist ID"
             else:
                 return False, f"上传配置失败: {update_response.status_code}"
         except Exception as e:
@@ -128,26 +130,38 @@ class GistManager:
             return False, "Token 或 Gist ID 未设置", None
         
         try:
-            # 获取 Gist 内容
-            response = requests.get(
+            # 获取 Gist 内容，带上次的 ETag 发送条件请求，未变化时服务器返回 304 且不带响应体
+            cache_key = (self.gist_id, self.filename)
+            cached = _etag_cache.get(cache_key)
+            headers = self.get_headers()
+            if cached:
+                headers["If-None-Match"] = cached[0]
+            response = self.session.get(
                 f"{self.base_url}/gists/{self.gist_id}", 
-                headers=self.get_headers()
+                headers=headers,
+                timeout=REQUEST_TIMEOUT
             )
             
-            if response.status_code != 200:
+            if response.status_code == 304 and cached:
+                file_content = cached[1]
+            elif response.status_code != 200:
                 return False, f"获取 Gist 失败: {response.status_code}", None
+            else:
+                # 解析响应
+                gist_data = json_utils.loads(response.content)
+                files = gist_data.get("files", {})
+                
+                if self.filename not in files:
+                    return False, f"Gist 中未找到文件: {self.filename}", None
+                
+                # 获取文件内容
+                file_content = files[self.filename].get("content", "{}")
+                etag = response.headers.get("ETag")
+                if etag:
+                    _etag_cache[cache_key] = (etag, file_content)
             
-            # 解析响应
-            gist_data = response.json()
-            files = gist_data.get("files", {})
-            
-            if self.filename not in files:
-                return False, f"Gist 中未找到文件: {self.filename}", None
-            
-            # 获取文件内容
-            file_content = files[self.filename].get("content", "{}")
             try:
-                synced_config = json.loads(file_content)
+                synced_config = json_utils.loads(file_content)
                 
                 # 读取本地配置以保留本地特定设置
                 local_config = load_config()
@@ -156,7 +170,7 @@ class GistManager:
                 merged_config = merge_synced_config(local_config, synced_config)
                 
                 return True, "配置已成功从 GitHub Gist 下载", merged_config
-            except json.JSONDecodeError:
+            except json_utils.JSONDecodeError:
                 return False, "配置文件格式无效", None
         except Exception as e:
             self.logger.error(f"从 GitHub 下载配置时出错: {e}")
@@ -176,7 +190,7 @@ class GistManager:
             
             # 准备创建 Gist 的数据
             files_data = {}
-            files_data[self.filename] = {"content": json.dumps(config, ensure_ascii=False, indent=2)}
+            files_data[self.filename] = {"content": json_utils.dumps(config, indent=False).decode('utf-8')}
             
             create_data = {
                 "description": description,
@@ -185,10 +199,11 @@ class GistManager:
             }
             
             # 创建 Gist
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/gists",
                 headers=self.get_headers(),
-                json=create_data
+                json=create_data,
+                timeout=REQUEST_TIMEOUT
             )
             
             if response.status_code == 201:
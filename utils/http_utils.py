@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+HTTP 工具
+
+为各同步管理器提供共享的 requests.Session，复用 keep-alive 连接，
+避免每次同步都重新建立 TCP/TLS 连接。
+"""
+
+from functools import lru_cache
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (连接超时, 读取超时)，单位秒
+REQUEST_TIMEOUT = (5, 30)
+
+# 连接错误、读取错误和网关错误都会重试的幂等方法；urllib3 默认不认识 WebDAV 的 PROPFIND
+RETRY_METHODS = frozenset({"GET", "HEAD", "PUT", "PROPFIND", "DELETE"})
+# 只在服务器返回网关错误时重试的方法：读取超时时请求可能已被处理，重发会重复提交
+STATUS_RETRY_METHODS = frozenset({"PATCH"})
+# POST（创建 Gist）不在以上集合中，只有请求尚未发出的连接错误才会重试
+
+
+class _SyncRetry(Retry):
+    """在 RETRY_METHODS 之外，允许 STATUS_RETRY_METHODS 按状态码重试"""
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if method and method.upper() in STATUS_RETRY_METHODS:
+            return bool(self.status_forcelist) and status_code in self.status_forcelist
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+@lru_cache(maxsize=1)
+def get_session() -> requests.Session:
+    """
+    获取进程内共享的 HTTP 会话
+
+    连接失败或网关错误时对 RETRY_METHODS 中的请求自动重试，
+    PATCH 只在网关错误时重试，POST 只在连接失败时重试。
+    认证信息随请求传入，会话本身不保存任何凭证。
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=4,
+        # 网关类错误同样重试；重试用尽后返回最后一次的响应而不是抛出异常
+        max_retries=_SyncRetry(
+            total=2,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=RETRY_METHODS,
+            raise_on_status=False,
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
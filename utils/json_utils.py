@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+JSON 序列化工具
+
+优先使用 orjson（C 实现，速度更快），未安装时回退到标准库 json。
+两种实现均以 UTF-8 字节作为输入输出，写文件时直接使用二进制模式。
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 取决于运行环境
+    orjson = None
+
+JSONDecodeError = json.JSONDecodeError  # orjson.JSONDecodeError 是其子类
+
+
+def loads(data):
+    """解析 JSON 字节、memoryview 或字符串"""
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def dumps(obj, indent: bool = True, sort_keys: bool = False) -> bytes:
+    """
+    将对象序列化为 UTF-8 编码的 JSON 字节
+
+    Args:
+        obj: 要序列化的对象
+        indent: 是否使用两个空格缩进输出
+        sort_keys: 是否按键排序
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option)
+    if indent:
+        text = json.dumps(obj, ensure_ascii=False, indent=2, sort_keys=sort_keys)
+    else:
+        text = json.dumps(obj, ensure_ascii=False, separators=(',', ':'), sort_keys=sort_keys)
+    return text.encode('utf-8')
@@ -2,17 +2,17 @@
 # -*- coding: utf-8 -*-
 
 import os
+import atexit
+import queue
 import logging
-import threading
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 
-# 单例日志记录器
-_logger = None
-_logger_lock = threading.Lock()
+# 后台日志线程，负责实际的文件和控制台写入
+_listener = None
 
-def get_logger(name="launcher"):
+def _build_logger(name):
     """
-    获取应用程序日志记录器
+    创建并配置应用程序日志记录器
     
     Args:
         name: 日志记录器名称
@@ -20,51 +20,66 @@ def get_logger(name="launcher"):
     Returns:
         logging.Logger: 配置好的日志记录器
     """
-    global _logger
+    global _listener
     
-    # 双重检查锁定模式
-    if _logger is not None:
-        return _logger
+    # 创建日志目录
+    log_dir = "logs"
+    os.makedirs(log_dir, exist_ok=True)
     
-    with _logger_lock:
-        # 再次检查，防止其他线程已经创建了logger
-        if _logger is not None:
-            return _logger
-        
-        # 创建日志目录
-        log_dir = "logs"
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-        
-        log_file = os.path.join(log_dir, "app.log")
+    log_file = os.path.join(log_dir, "app.log")
+    
+    # 日志格式
+    log_format = "%(asctime)s [%(levelname)s] %(filename)s:%(lineno)d - %(message)s"
+    date_format = "%Y-%m-%d %H:%M:%S"
+    
+    # 创建日志记录器
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.DEBUG)  # 改为DEBUG级别以便查看性能日志
+    # 日志已由自身的处理器输出，不再传递给根记录器
+    logger.propagate = False
+    
+    # 防止重复添加处理器
+    if not logger.handlers:
+        # 两个处理器共用同一个格式化器
+        formatter = logging.Formatter(log_format, date_format)
         
-        # 日志格式
-        log_format = "%(asctime)s [%(levelname)s] %(filename)s:%(lineno)d - %(message)s"
-        date_format = "%Y-%m-%d %H:%M:%S"
+        # 文件处理器 - 使用循环日志文件，最大5MB，保留3个备份
+        file_handler = RotatingFileHandler(
+            log_file, 
+            maxBytes=5*1024*1024,  # 5MB
+            backupCount=3,
+            encoding='utf-8'
+        )
+        file_handler.setFormatter(formatter)
         
-        # 创建日志记录器
-        logger = logging.getLogger(name)
-        logger.setLevel(logging.DEBUG)  # 改为DEBUG级别以便查看性能日志
+        # 控制台处理器
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
         
-        # 防止重复添加处理器
-        if not logger.handlers:
-            # 文件处理器 - 使用循环日志文件，最大5MB，保留3个备份
-            file_handler = RotatingFileHandler(
-                log_file, 
-                maxBytes=5*1024*1024,  # 5MB
-                backupCount=3,
-                encoding='utf-8'
-            )
-            file_handler.setFormatter(logging.Formatter(log_format, date_format))
-            logger.addHandler(file_handler)
-            
-            # 控制台处理器
-            console_handler = logging.StreamHandler()
-            console_handler.setFormatter(logging.Formatter(log_format, date_format))
-            logger.addHandler(console_handler)
+        # 调用方只把日志记录放入队列，文件写入和日志轮转由后台线程完成
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(QueueHandler(log_queue))
+        _listener = QueueListener(log_queue, file_handler, console_handler)
+        _listener.start()
+        # 退出时处理完队列中剩余的日志
+        atexit.register(_listener.stop)
+    
+    return logger
+
+# 单例日志记录器，导入模块时创建，之后无需加锁
+_logger = _build_logger("launcher")
+
+def get_logger(name="launcher"):
+    """
+    获取应用程序日志记录器
+    
+    Args:
+        name: 日志记录器名称（保留参数，所有模块共享同一个记录器）
         
-        _logger = logger
-        return logger
+    Returns:
+        logging.Logger: 配置好的日志记录器
+    """
+    return _logger
 
 def set_log_level(level):
     """
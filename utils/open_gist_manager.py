@@ -1,8 +1,8 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import requests
-import json
+from utils import json_utils
+from utils.http_utils import get_session, REQUEST_TIMEOUT
 from utils.logger import get_logger
 from utils.config_manager import load_config, save_config, prepare_config_for_sync, merge_synced_config
 
@@ -12,6 +12,8 @@ class OpenGistManager:
     def __init__(self):
         self.logger = get_logger()
         self.base_url = ""  # Open Gist的API地址
+        # 共享的 HTTP 会话，连续的同步请求复用同一个 keep-alive 连接
+        self.session = get_session()
         # 从配置中读取 Open Gist 相关设置
         config = load_config()
         self.open_gist_config = config.get("open_gist_sync", {})
@@ -66,9 +68,10 @@ class OpenGistManager:
         
         try:
             # 测试 API 连接
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/gists/{self.gist_id}", 
-                headers=self.get_headers()
+                headers=self.get_headers(),
+                timeout=REQUEST_TIMEOUT
             )
             
             if response.status_code == 200:
@@ -98,29 +101,25 @@ class OpenGistManager:
             # 准备用于同步的配置（排除本地特定设置）
             sync_config = prepare_config_for_sync(config)
             
-            # 检查 Gist 是否存在
-            response = requests.get(
-                f"{self.base_url}/gists/{self.gist_id}", 
-                headers=self.get_headers()
-            )
-            
-            if response.status_code != 200:
-                return False, f"获取 Gist 失败: {response.status_code}"
-            
-            # 准备更新数据
+            # 准备更新数据（直接 PATCH，不再预先 GET 检查 Gist 是否存在）
             files_data = {}
-            files_data[self.filename] = {"content": json.dumps(sync_config, ensure_ascii=False, indent=2)}
+            files_data[self.filename] = {"content": json_utils.dumps(sync_config, indent=False).decode('utf-8')}
             
             # 更新 Gist
             update_data = {"files": files_data}
-            update_response = requests.patch(
+            update_response = self.session.patch(
                 f"{self.base_url}/gists/{self.gist_id}",
                 headers=self.get_headers(),
-                json=update_data
+                data=json_utils.dumps(update_data, indent=False),
+                timeout=REQUEST_TIMEOUT
             )
             
             if update_response.status_code == 200:
                 return True, "配置已成功上传到 Open Gist"
+            elif update_response.status_code == 401:
+                return False, "认证失败，请检查 API Key"
+            elif update_response.status_code == 404:
+                return False, "未找到 Gist，请检查 Gist ID"
             else:
                 return False, f"上传配置失败: {update_response.status_code}"
         except Exception as e:
@@ -137,16 +136,17 @@ class OpenGistManager:
         
         try:
             # 获取 Gist 内容
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/gists/{self.gist_id}", 
-                headers=self.get_headers()
+                headers=self.get_headers(),
+                timeout=REQUEST_TIMEOUT
             )
             
             if response.status_code != 200:
                 return False, f"获取 Gist 失败: {response.status_code}", None
             
             # 解析响应
-            gist_data = response.json()
+            gist_data = json_utils.loads(response.content)
             files = gist_data.get("files", {})
             
             if self.filename not in files:
@@ -155,7 +155,7 @@ class OpenGistManager:
             # 获取文件内容
             file_content = files[self.filename].get("content", "{}")
             try:
-                synced_config = json.loads(file_content)
+                synced_config = json_utils.loads(file_content)
                 
                 # 读取本地配置以保留本地特定设置
                 local_config = load_config()
@@ -164,7 +164,7 @@ class OpenGistManager:
                 merged_config = merge_synced_config(local_config, synced_config)
                 
                 return True, "配置已成功从 Open Gist 下载", merged_config
-            except json.JSONDecodeError:
+            except json_utils.JSONDecodeError:
                 return False, "配置文件格式无效", None
         except Exception as e:
             self.logger.error(f"从 Open Gist 下载配置时出错: {e}")
@@ -184,7 +184,7 @@ class OpenGistManager:
             
             # 准备创建 Gist 的数据
             files_data = {}
-            files_data[self.filename] = {"content": json.dumps(config, ensure_ascii=False, indent=2)}
+            files_data[self.filename] = {"content": json_utils.dumps(config, indent=False).decode('utf-8')}
             
             create_data = {
                 "description": description,
@@ -193,10 +193,11 @@ class OpenGistManager:
             }
             
             # 创建 Gist
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/gists",
                 headers=self.get_headers(),
-                json=create_data
+                data=json_utils.dumps(create_data, indent=False),
+                timeout=REQUEST_TIMEOUT
             )
             
             if response.status_code == 201:
@@ -3,10 +3,12 @@
 
 import os
 import platform
+from functools import lru_cache
 from typing import Dict, Any
 
+@lru_cache(maxsize=1)
 def get_os_type() -> str:
-    """返回当前操作系统类型"""
+    """返回当前操作系统类型（进程内不会变化，只检测一次）"""
     system = platform.system().lower()
     if system == "darwin":
         return "mac"
@@ -15,6 +17,7 @@ def get_os_type() -> str:
     else:
         return "linux"
 
+@lru_cache(maxsize=256)
 def expand_path(path: str) -> str:
-    """展开路径中的用户目录 (如 ~/projects)"""
+    """展开路径中的用户目录 (如 ~/projects)，结果按输入缓存"""
     return os.path.expanduser(path) 
\ No newline at end of file
@@ -40,15 +40,14 @@ def resource_path(*parts: str) -> str:
     return str(get_project_root().joinpath(*parts))
 
 
+@lru_cache(maxsize=64)
 def _expand_path(value: str | None) -> Path | None:
     if not value:
         return None
     return Path(os.path.expandvars(os.path.expanduser(value))).resolve()
 
 
-def _default_user_base_dir() -> Path:
-    if override := _expand_path(os.getenv(USER_DATA_ENV)):
-        return override
+def _compute_platform_base() -> Path:
     home = Path.home()
     if sys.platform.startswith("win"):
         roaming = os.getenv("APPDATA")
@@ -61,6 +60,14 @@ def _default_user_base_dir() -> Path:
     return base / LINUX_APP_DIR
 
 
+# The platform never changes within a process, so only the env override is checked at runtime.
+_PLATFORM_BASE = _compute_platform_base()
+
+
+def _default_user_base_dir() -> Path:
+    return _expand_path(os.getenv(USER_DATA_ENV)) or _PLATFORM_BASE
+
+
 @lru_cache(maxsize=1)
 def get_user_data_dir() -> Path:
     """Return (and create) the per-user data directory for configs and credentials."""
@@ -69,32 +76,44 @@ def get_user_data_dir() -> Path:
     return path
 
 
+@lru_cache(maxsize=1)
 def get_user_config_path() -> Path:
     return get_user_data_dir() / "config.json"
 
 
+@lru_cache(maxsize=1)
 def get_user_credentials_path() -> Path:
     return get_user_data_dir() / "credentials.enc"
 
 
+def get_user_history_path() -> Path:
+    """Return the config history directory without creating it (the legacy migration needs it absent)."""
+    return get_user_data_dir() / "config_history"
+
+
+@lru_cache(maxsize=1)
 def get_user_history_dir() -> Path:
-    path = get_user_data_dir() / "config_history"
+    """Return (and create) the config history directory; the mkdir only runs on first access."""
+    path = get_user_history_path()
     path.mkdir(parents=True, exist_ok=True)
     return path
 
 
+@lru_cache(maxsize=1)
 def get_legacy_config_path() -> Path:
     if override := _expand_path(os.getenv(LEGACY_CONFIG_ENV)):
         return override
     return get_project_root() / "config.json"
 
 
+@lru_cache(maxsize=1)
 def get_legacy_history_dir() -> Path:
     if override := _expand_path(os.getenv(LEGACY_HISTORY_ENV)):
         return override
     return get_project_root() / "config_history"
 
 
+@lru_cache(maxsize=1)
 def get_legacy_credentials_path() -> Path:
     if override := _expand_path(os.getenv(LEGACY_CREDENTIALS_ENV)):
         return override
@@ -117,9 +136,30 @@ def migrate_legacy_file(legacy_path: Path, target_path: Path) -> Path | None:
 
 
 def migrate_legacy_directory(legacy_dir: Path, target_dir: Path) -> Path | None:
-    """Copy a legacy directory into the user directory and archive the original once."""
-    if not legacy_dir.exists() or target_dir.exists():
+    """
+    Move a legacy directory into the user directory once.
+
+    On the same file system the directory is renamed in place and a marker file recording the
+    move is left next to the old location; across devices it is copied and the original archived.
+    An empty target directory (e.g. created by an earlier start-up) does not block the migration.
+    """
+    if not legacy_dir.exists():
         return None
+    if target_dir.exists():
+        try:
+            target_dir.rmdir()
+        except OSError:
+            # Not empty (or not removable): the user directory already holds data
+            return None
+    target_dir.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.rename(legacy_dir, target_dir)
+    except OSError:
+        pass
+    else:
+        marker = legacy_dir.with_name(f"{legacy_dir.name}.migrated-{_timestamp_suffix()}.txt")
+        marker.write_text(f"Moved to {target_dir}\n", encoding="utf-8")
+        return marker
     shutil.copytree(legacy_dir, target_dir)
     backup = legacy_dir.with_name(f"{legacy_dir.name}.migrated-{_timestamp_suffix()}")
     shutil.move(str(legacy_dir), str(backup))
@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import re
 from typing import Dict, Any
 from utils.os_utils import get_os_type as get_platform
 
@@ -574,46 +575,61 @@ PLATFORM_SETTINGS = {
     }
 }
 
+def _flatten_settings(settings: Dict[str, Any], prefix: str = '') -> Dict[str, Any]:
+    """将嵌套设置展开为以点号路径为键的字典，例如 'default_window_size.width_ratio'"""
+    table = {}
+    for key, value in settings.items():
+        path = f"{prefix}{key}"
+        table[path] = value
+        if isinstance(value, dict):
+            table.update(_flatten_settings(value, f"{path}."))
+    return table
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+def _minify(css: str) -> str:
+    """压缩样式表中的连续空白，减少 Qt 每次 setStyleSheet 时需要解析的字符数"""
+    return _WHITESPACE_RE.sub(' ', css).strip()
+
+# 运行期间平台不会变化，导入时即确定当前平台的样式和设置
+_PLATFORM = get_platform()
+_CURRENT_STYLES = {
+    name: _minify(css)
+    for name, css in PLATFORM_STYLES.get(_PLATFORM, PLATFORM_STYLES['windows']).items()
+}
+_CURRENT_SETTINGS = PLATFORM_SETTINGS.get(_PLATFORM, PLATFORM_SETTINGS['windows'])
+_SETTING_TABLE = _flatten_settings(_CURRENT_SETTINGS)
+
 # 获取当前平台的设置
 def get_platform_style(style_name: str = 'main_window') -> str:
     """获取当前平台的样式设置"""
-    platform = get_platform()
-    return PLATFORM_STYLES.get(platform, PLATFORM_STYLES['windows']).get(style_name, '')
+    return _CURRENT_STYLES.get(style_name, '')
 
 def get_platform_setting(setting_path: str = None) -> Any:
     """获取当前平台的特定设置
     
     参数:
-        setting_path: 设置路径，例如 'window_close_behavior'
+        setting_path: 设置路径，例如 'window_close_behavior'，
+            嵌套设置使用点号分隔，例如 'default_window_size.width_ratio'
     """
-    platform = get_platform()
-    settings = PLATFORM_SETTINGS.get(platform, PLATFORM_SETTINGS['windows'])
-    
     if not setting_path:
-        return settings
+        return _CURRENT_SETTINGS
     
-    # 处理嵌套路径，例如 'default_window_size.width_ratio'
-    if '.' in setting_path:
-        parts = setting_path.split('.')
-        current = settings
-        for part in parts:
-            if isinstance(current, dict) and part in current:
-                current = current[part]
-            else:
-                return None
-        return current
-    
-    return settings.get(setting_path, None)
+    return _SETTING_TABLE.get(setting_path)
 
 # 单独检查平台是否是Windows/Mac/Linux
+IS_WINDOWS = _PLATFORM == 'windows'
+IS_MAC = _PLATFORM == 'mac'
+IS_LINUX = _PLATFORM == 'linux'
+
 def is_windows() -> bool:
     """检查当前平台是否是Windows"""
-    return get_platform() == 'windows'
+    return IS_WINDOWS
 
 def is_mac() -> bool:
     """检查当前平台是否是macOS"""
-    return get_platform() == 'mac'
+    return IS_MAC
 
 def is_linux() -> bool:
     """检查当前平台是否是Linux"""
-    return get_platform() == 'linux' 
\ No newline at end of file
+    return IS_LINUX
\ No newline at end of file
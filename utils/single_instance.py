@@ -2,7 +2,9 @@
 # -*- coding: utf-8 -*-
 
 import os
+import selectors
 import socket
+import sys
 import tempfile
 import threading
 from contextlib import closing
@@ -12,6 +14,30 @@ from utils.logger import get_logger
 
 logger = get_logger("single_instance")
 
+if os.name == "nt":
+    import msvcrt
+
+    def _lock_file(handle):
+        msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+
+    def _unlock_file(handle):
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_file(handle):
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def _unlock_file(handle):
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+# 非 Windows 平台使用 UNIX 套接字通信，无需端口文件和回环 TCP 握手。
+# Linux 使用抽象命名空间，进程退出后地址自动释放；macOS 使用 /tmp 下的套接字文件
+# （临时目录路径过长，可能超出 sun_path 的长度限制）
+_USE_UNIX_SOCKET = os.name != "nt"
+_USE_ABSTRACT_SOCKET = sys.platform.startswith("linux")
+_SOCKET_DIR = "/tmp"
+
 
 class SingleInstanceManager:
     """Coordinates a single running instance with local socket activation."""
@@ -22,6 +48,9 @@ class SingleInstanceManager:
         self.server_socket: Optional[socket.socket] = None
         self.listener_thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
+        # 唤醒监听线程的套接字对，关闭时写入一个字节即可让 select 立即返回
+        self._wake_reader: Optional[socket.socket] = None
+        self._wake_writer: Optional[socket.socket] = None
         self._activation_handler: Optional[Callable[[], None]] = None
         self._lock_file_handle: Optional[object] = None
 
@@ -29,6 +58,33 @@ class SingleInstanceManager:
         directory = tempfile.gettempdir()
         return os.path.join(directory, f"{self.app_id}.port")
 
+    def _build_socket_address(self) -> str:
+        name = f"{self.app_id}-{os.getuid()}"
+        if _USE_ABSTRACT_SOCKET:
+            return f"\0{name}"
+        return os.path.join(_SOCKET_DIR, f"{name}.sock")
+
+    def _remove_socket_file(self):
+        try:
+            os.remove(self._build_socket_address())
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            logger.warning(f"移除套接字文件失败: {exc}")
+
+    def _create_server_socket(self) -> socket.socket:
+        if _USE_UNIX_SOCKET:
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            if not _USE_ABSTRACT_SOCKET:
+                # 已持有单实例锁，残留的套接字文件只可能来自异常退出的旧实例
+                self._remove_socket_file()
+            server.bind(self._build_socket_address())
+        else:
+            server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server.bind(("127.0.0.1", 0))
+        server.listen(1)
+        return server
+
     def _build_lock_file(self) -> str:
         directory = tempfile.gettempdir()
         return os.path.join(directory, f"{self.app_id}.lock")
@@ -70,16 +126,8 @@ class SingleInstanceManager:
             return False
 
         try:
-            if os.name == "nt":
-                import msvcrt
-
-                handle.seek(0)
-                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
-            else:
-                import fcntl
-
-                handle.seek(0)
-                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            handle.seek(0)
+            _lock_file(handle)
             handle.seek(0)
             handle.write(str(os.getpid()))
             handle.flush()
@@ -102,14 +150,7 @@ class SingleInstanceManager:
         except Exception:
             pass
         try:
-            if os.name == "nt":
-                import msvcrt
-
-                msvcrt.locking(self._lock_file_handle.fileno(), msvcrt.LK_UNLCK, 1)
-            else:
-                import fcntl
-
-                fcntl.flock(self._lock_file_handle.fileno(), fcntl.LOCK_UN)
+            _unlock_file(self._lock_file_handle)
         except Exception as exc:
             logger.warning(f"释放单实例锁失败: {exc}")
         finally:
@@ -132,55 +173,77 @@ class SingleInstanceManager:
             return False
 
         try:
-            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.server_socket.bind(("127.0.0.1", 0))
-            self.server_socket.listen(1)
-            self.port = self.server_socket.getsockname()[1]
+            self.server_socket = self._create_server_socket()
+            self._wake_reader, self._wake_writer = socket.socketpair()
             self.listener_thread = threading.Thread(target=self._listen_loop, daemon=True)
             self.listener_thread.start()
-            self._write_port_file(self.port)
-            logger.info(f"单实例锁成功，监听端口{self.port}")
+            if _USE_UNIX_SOCKET:
+                logger.info("单实例锁成功，监听本地套接字")
+            else:
+                self.port = self.server_socket.getsockname()[1]
+                self._write_port_file(self.port)
+                logger.info(f"单实例锁成功，监听端口{self.port}")
             return True
         except OSError as exc:
-            logger.info(f"无法绑定端口成为主实例: {exc}")
+            logger.info(f"无法绑定套接字成为主实例: {exc}")
             self._close_server()
             self._release_file_lock()
             return False
 
     def _listen_loop(self):
-        while not self._stop_event.is_set():
-            try:
-                if not self.server_socket:
+        server, wake_reader = self.server_socket, self._wake_reader
+        if not server or not wake_reader:
+            return
+        # 阻塞等待新连接或唤醒信号，空闲时不再周期性超时轮询
+        with selectors.DefaultSelector() as selector:
+            selector.register(server, selectors.EVENT_READ)
+            selector.register(wake_reader, selectors.EVENT_READ)
+            while not self._stop_event.is_set():
+                try:
+                    events = selector.select()
+                except OSError:
+                    break
+                if any(key.fileobj is wake_reader for key, _ in events):
                     break
-                self.server_socket.settimeout(0.5)
-                client, _ = self.server_socket.accept()
-            except socket.timeout:
-                continue
-            except OSError:
-                break
-            with closing(client):
                 try:
-                    data = client.recv(1024)
-                    if data.strip() == b"activate":
-                        logger.info("收到激活请求")
-                        if self._activation_handler:
-                            self._activation_handler()
-                        client.sendall(b"ok")
-                except Exception as exc:
-                    logger.error(f"处理激活请求失败: {exc}")
+                    client, _ = server.accept()
+                except OSError:
+                    break
+                with closing(client):
+                    try:
+                        data = client.recv(1024)
+                        if data.strip() == b"activate":
+                            logger.info("收到激活请求")
+                            if self._activation_handler:
+                                self._activation_handler()
+                            client.sendall(b"ok")
+                    except Exception as exc:
+                        logger.error(f"处理激活请求失败: {exc}")
 
     def _close_server(self):
         self._stop_event.set()
-        if self.server_socket:
+        if self._wake_writer:
             try:
-                self.server_socket.close()
-            except Exception:
+                self._wake_writer.send(b"\0")
+            except OSError:
                 pass
-            self.server_socket = None
+        # 先等监听线程退出，再关闭它正在等待的套接字
         if self.listener_thread and self.listener_thread.is_alive():
             self.listener_thread.join(timeout=1.0)
-            self.listener_thread = None
-        self._remove_port_file()
+        self.listener_thread = None
+        for sock in (self.server_socket, self._wake_reader, self._wake_writer):
+            if sock:
+                try:
+                    sock.close()
+                except Exception:
+                    pass
+        self.server_socket = None
+        self._wake_reader = None
+        self._wake_writer = None
+        if not _USE_UNIX_SOCKET:
+            self._remove_port_file()
+        elif not _USE_ABSTRACT_SOCKET:
+            self._remove_socket_file()
         self._stop_event.clear()
 
     def release(self):
@@ -191,14 +254,18 @@ class SingleInstanceManager:
 
     def activate_existing(self, timeout: float = 1.0) -> bool:
         """通知现有实例显示窗口"""
-        port = self.port or self._read_port_file()
-        if not port:
-            logger.warning("未找到现有实例端口")
-            return False
-        with closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as client:
+        if _USE_UNIX_SOCKET:
+            family, address = socket.AF_UNIX, self._build_socket_address()
+        else:
+            port = self.port or self._read_port_file()
+            if not port:
+                logger.warning("未找到现有实例端口")
+                return False
+            family, address = socket.AF_INET, ("127.0.0.1", port)
+        with closing(socket.socket(family, socket.SOCK_STREAM)) as client:
             client.settimeout(timeout)
             try:
-                client.connect(("127.0.0.1", port))
+                client.connect(address)
                 client.sendall(b"activate")
                 data = client.recv(16)
                 return data.strip() == b"ok"
@@ -1,46 +1,68 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import sys
 from typing import List, Dict, Any
 
+_RESET = '\033[0m'
+_COLORS = {
+    'reset': _RESET,
+    'red': '\033[91m',
+    'green': '\033[92m',
+    'yellow': '\033[93m',
+    'blue': '\033[94m',
+    'magenta': '\033[95m',
+    'cyan': '\033[96m',
+    'white': '\033[97m',
+    'bold': '\033[1m',
+    'underline': '\033[4m'
+}
+# 输出被重定向到文件或管道时不添加颜色控制码
+_NO_COLOR = sys.stdout is None or not sys.stdout.isatty()
+_COLOR_PREFIXES = {} if _NO_COLOR else _COLORS
+
+_SEPARATOR = "─" * 50
+_BANNER = (
+    "╔═════════════════════════════════════╗",
+    "║           程序启动器               ║",
+    "╚═════════════════════════════════════╝",
+)
+_HELP_LINES = (
+    "  数字: 选择单个程序",
+    "  多个数字(用空格分隔): 同时选择多个程序 (例如: 1 3)",
+    "  a: 选择所有程序",
+    "  q: 退出程序",
+)
+
+def _colorize(text: str, color: str = None) -> str:
+    """为文本加上颜色控制码"""
+    prefix = _COLOR_PREFIXES.get(color)
+    if prefix is None:
+        return text
+    return f"{prefix}{text}{_RESET}"
+
 def print_colored(text: str, color: str = None) -> None:
     """打印彩色文本"""
-    colors = {
-        'reset': '\033[0m',
-        'red': '\033[91m',
-        'green': '\033[92m',
-        'yellow': '\033[93m',
-        'blue': '\033[94m',
-        'magenta': '\033[95m',
-        'cyan': '\033[96m',
-        'white': '\033[97m',
-        'bold': '\033[1m',
-        'underline': '\033[4m'
-    }
-    
-    if color and color in colors:
-        print(f"{colors[color]}{text}{colors['reset']}")
-    else:
-        print(text)
+    print(_colorize(text, color))
 
 def display_menu_multi(programs: List[Dict[str, Any]]) -> List[int]:
     """显示程序菜单并支持多选"""
-    print("\n")
-    print_colored("╔═════════════════════════════════════╗", "cyan")
-    print_colored("║           程序启动器               ║", "cyan")
-    print_colored("╚═════════════════════════════════════╝", "cyan")
-    print("\n可用程序列表:")
-    
-    for idx, program in enumerate(programs, 1):
-        print_colored(f"  {idx}. {program['name']} - {program['description']}", "green")
+    # 整个菜单拼接后一次性输出
+    lines = ["\n"]
+    lines.extend(_colorize(line, "cyan") for line in _BANNER)
+    lines.append("\n可用程序列表:")
+    lines.extend(
+        _colorize(f"  {idx}. {program['name']} - {program['description']}", "green")
+        for idx, program in enumerate(programs, 1)
+    )
+    lines.append("\n" + _SEPARATOR)
+    lines.append(_colorize("命令说明:", "yellow"))
+    lines.extend(_HELP_LINES)
+    lines.append(_SEPARATOR + "\n")
+    sys.stdout.write("\n".join(lines) + "\n")
     
-    print("\n" + "─" * 50)
-    print_colored("命令说明:", "yellow")
-    print("  数字: 选择单个程序")
-    print("  多个数字(用空格分隔): 同时选择多个程序 (例如: 1 3)")
-    print("  a: 选择所有程序")
-    print("  q: 退出程序")
-    print("─" * 50 + "\n")
+    count = len(programs)
+    range_error = f"错误: 选择范围应在 1 到 {count} 之间"
     
     while True:
         choice = input("> 请输入您的选择: ").strip().lower()
@@ -49,23 +71,18 @@ def display_menu_multi(programs: List[Dict[str, Any]]) -> List[int]:
             return []
         
         if choice == 'a':
-            return list(range(1, len(programs) + 1))
+            return list(range(1, count + 1))
         
         try:
-            # 处理多选
-            if ' ' in choice:
-                selections = [int(x) for x in choice.split()]
-                # 验证所有选择是否有效
-                if all(1 <= s <= len(programs) for s in selections):
-                    return selections
-                else:
-                    print_colored("错误: 选择范围应在 1 到 {} 之间".format(len(programs)), "red")
-            else:
-                # 处理单选
-                selection = int(choice)
-                if 1 <= selection <= len(programs):
-                    return [selection]
-                else:
-                    print_colored("错误: 选择范围应在 1 到 {} 之间".format(len(programs)), "red")
+            # 单个数字与空格分隔的多个数字统一处理
+            selections = [int(x) for x in choice.split()]
+            if not selections:
+                raise ValueError(choice)
         except ValueError:
-            print_colored("错误: 请输入有效的数字或命令", "red") 
\ No newline at end of file
+            print_colored("错误: 请输入有效的数字或命令", "red")
+            continue
+        
+        # 验证所有选择是否有效
+        if all(1 <= s <= count for s in selections):
+            return selections
+        print_colored(range_error, "red")
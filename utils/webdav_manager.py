@@ -1,22 +1,72 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import json
-import os
-import requests
-from requests.auth import HTTPBasicAuth
 import base64
-from urllib.parse import urlparse, urljoin
+import hashlib
+import posixpath
+from functools import cached_property
+import requests
+from utils import json_utils
+from utils.http_utils import get_session
 from utils.logger import get_logger
 from utils.config_manager import load_config, save_config, prepare_config_for_sync, merge_synced_config
 from utils.credential_manager import CredentialManager
 
+# 连接测试只请求资源类型，避免服务器返回全部属性
+_PROPFIND_RESOURCETYPE = (
+    b'<?xml version="1.0" encoding="utf-8"?>'
+    b'<d:propfind xmlns:d="DAV:"><d:prop><d:resourcetype/></d:prop></d:propfind>'
+)
+
+# 最近一次上传或下载时远程文件的状态：文件 URL -> (内容摘要, 上传时服务器返回的强 ETag 或 None)。
+# 只有自己 PUT 得到的强 ETag 才用作 If-Match，下载得到的 ETag 可能经过压缩等转换，不能用于强比较。
+# 每次同步都会新建 WebDAVManager，因此缓存放在模块级别
+_upload_cache = {}
+
+
+# 条件请求缓存：文件 URL -> (ETag, Last-Modified, 文件内容)
+_download_cache = {}
+
+
+def _norm_dir(path: str) -> str:
+    """规范化远程目录：以/开头且以/结尾，空路径视为根目录"""
+    path = (path or '').strip('/')
+    return f"/{path}/" if path else '/'
+
+
+def _digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _strong_etag(etag):
+    """返回可用于 If-Match 的强 ETag；弱 ETag（W/）或经压缩转换的 ETag（如 "...-gzip"）返回 None"""
+    if not etag or etag.startswith('W/'):
+        return None
+    if '-gzip' in etag or ';gzip' in etag:
+        return None
+    return etag
+
+
+def _basic_auth_header(username: str, password: str) -> str:
+    """生成 Basic 认证头（与 requests 一致优先使用 latin1 编码）"""
+    credentials = f"{username}:{password}"
+    try:
+        raw = credentials.encode('latin1')
+    except UnicodeEncodeError:
+        raw = credentials.encode('utf-8')
+    return "Basic " + base64.b64encode(raw).decode('ascii')
+
 class WebDAVManager:
     """WebDAV 管理器，用于将配置同步到 WebDAV 服务"""
     
     def __init__(self):
         self.logger = get_logger()
-        self.credential_manager = CredentialManager()
+        self.session = get_session()
+        # 密码在首次使用时才从安全存储读取，未启用 WebDAV 时不必解密凭证
+        self._password = None
+        # 编码后的认证头只缓存在当前实例上，用户名或密码变化时重新生成
+        self._auth_key = None
+        self._auth_header = None
         
         # 从配置中读取 WebDAV 相关设置
         config = load_config()
@@ -25,29 +75,38 @@ class WebDAVManager:
         self.server_url = self.webdav_config.get("server_url", "")
         self.username = self.webdav_config.get("username", "")
         
-        # 从安全存储获取密码，如果不存在则尝试从配置迁移
-        stored_username, stored_password = self.credential_manager.get_credential("webdav")
-        if stored_password:
-            self.password = stored_password
-        else:
-            # 迁移旧的明文密码到安全存储
-            old_password = self.webdav_config.get("password", "")
-            if old_password:
-                self.credential_manager.store_credential("webdav", self.username, old_password)
-                self.password = old_password
-                self.logger.info("已将WebDAV密码迁移到安全存储")
-            else:
-                self.password = ""
-        
-        self.remote_path = self.webdav_config.get("remote_path", "/")
+        self.remote_path = _norm_dir(self.webdav_config.get("remote_path", "/"))
         self.filename = self.webdav_config.get("filename", "launcher_config.json")
         self.auto_sync = self.webdav_config.get("auto_sync", False)
+    
+    @cached_property
+    def credential_manager(self):
+        return CredentialManager()
+    
+    @property
+    def password(self):
+        """WebDAV 密码，首次访问时从安全存储读取"""
+        if self._password is None:
+            self._password = self._load_password()
+        return self._password
+    
+    @password.setter
+    def password(self, value):
+        self._password = value
+    
+    def _load_password(self):
+        """从安全存储获取密码，如果不存在则尝试从配置迁移"""
+        stored_username, stored_password = self.credential_manager.get_credential("webdav")
+        if stored_password:
+            return stored_password
         
-        # 确保远程路径以/开头且以/结尾
-        if self.remote_path and not self.remote_path.startswith('/'):
-            self.remote_path = '/' + self.remote_path
-        if self.remote_path and not self.remote_path.endswith('/'):
-            self.remote_path = self.remote_path + '/'
+        # 迁移旧的明文密码到安全存储
+        old_password = self.webdav_config.get("password", "")
+        if old_password:
+            self.credential_manager.store_credential("webdav", self.username, old_password)
+            self.logger.info("已将WebDAV密码迁移到安全存储")
+            return old_password
+        return ""
     
     def set_config(self, enabled, server_url, username, password, remote_path="/", filename="launcher_config.json", auto_sync=False):
         """设置 WebDAV 配置"""
@@ -60,12 +119,7 @@ class WebDAVManager:
         if password:
             self.credential_manager.store_credential("webdav", username, password)
         
-        # 确保远程路径以/开头且以/结尾
-        if remote_path and not remote_path.startswith('/'):
-            remote_path = '/' + remote_path
-        if remote_path and not remote_path.endswith('/'):
-            remote_path = remote_path + '/'
-            
+        remote_path = _norm_dir(remote_path)
         self.remote_path = remote_path
         self.filename = filename
         self.auto_sync = auto_sync
@@ -83,66 +137,57 @@ class WebDAVManager:
         }
         save_config(config)
     
-    def get_auth(self):
-        """获取基本认证"""
-        return HTTPBasicAuth(self.username, self.password)
+    def get_headers(self, extra=None):
+        """获取带基本认证的请求头"""
+        key = (self.username, self.password)
+        if key != self._auth_key:
+            self._auth_header = _basic_auth_header(*key)
+            self._auth_key = key
+        headers = {"Authorization": self._auth_header}
+        if extra:
+            headers.update(extra)
+        return headers
     
     def get_full_url(self, path=""):
         """获取完整的URL路径"""
-        base_url = self.server_url
-        if not base_url.endswith('/'):
-            base_url += '/'
-            
-        # 如果提供了路径，确保它不以/开头
-        if path.startswith('/'):
-            path = path[1:]
-            
-        return urljoin(base_url, path)
+        return self.server_url.rstrip('/') + '/' + path.lstrip('/')
     
     def get_file_url(self):
-        """获取配置文件的URL"""
-        path = os.path.join(self.remote_path, self.filename)
-        if path.startswith('/'):
-            path = path[1:]
-        return self.get_full_url(path)
+        """获取配置文件的URL（URL 路径固定使用 / 分隔，不能用 os.path.join）"""
+        return self.get_full_url(posixpath.join(self.remote_path, self.filename))
     
-    def test_connection(self):
-        """测试 WebDAV 连接是否正常"""
+    def _get_not_ready_reason(self):
+        """返回无法进行同步的原因，配置完整时返回 None"""
         if not self.enabled:
-            return False, "WebDAV 同步未启用"
-            
+            return "WebDAV 同步未启用"
         if not self.server_url or not self.username or not self.password:
-            return False, "服务器URL、用户名或密码未设置"
+            return "服务器URL、用户名或密码未设置"
+        return None
+    
+    def test_connection(self):
+        """测试 WebDAV 连接是否正常"""
+        error = self._get_not_ready_reason()
+        if error:
+            return False, error
         
         try:
-            # 尝试OPTIONS请求测试服务器连接
-            response = requests.options(
+            # 一次 PROPFIND 即可同时验证连接、认证和WebDAV支持
+            response = self.session.request(
+                "PROPFIND",
                 self.get_full_url(),
-                auth=self.get_auth(),
+                headers=self.get_headers({"Depth": "0", "Content-Type": "application/xml; charset=utf-8"}),
+                data=_PROPFIND_RESOURCETYPE,
                 timeout=10
             )
             
-            if response.status_code >= 200 and response.status_code < 300:
-                # 检查DAV头，确认是WebDAV服务器
-                dav_header = response.headers.get('DAV') or ""
-                if "1" in dav_header.split(",") or "2" in dav_header.split(","):
-                    # 尝试PROPFIND请求确认WebDAV功能可用
-                    propfind_response = requests.request(
-                        "PROPFIND", 
-                        self.get_full_url(),
-                        auth=self.get_auth(),
-                        headers={"Depth": "0"},
-                        timeout=10
-                    )
-                    
-                    if propfind_response.status_code == 207:  # 207是WebDAV成功响应
-                        return True, "连接成功"
-                    else:
-                        return False, f"WebDAV功能测试失败: {propfind_response.status_code}"
-                else:
-                    return False, "服务器不支持WebDAV"
+            if response.status_code == 207:  # 207是WebDAV成功响应
+                return True, "连接成功"
             elif response.status_code == 401:
                 return False, "认证失败，请检查用户名和密码"
+            elif response.status_code == 404:
+                return False, "服务器URL不存在，请检查路径"
+            elif response.status_code in (405, 501):
+                return False, "服务器不支持WebDAV"
             else:
                 return False, f"连接错误: {response.status_code}"
         except requests.exceptions.RequestException as e:
@@ -153,10 +198,10 @@ class WebDAVManager:
         """创建远程目录"""
         try:
             dir_url = self.get_full_url(path)
-            response = requests.request(
+            response = self.session.request(
                 "MKCOL",
                 dir_url,
-                auth=self.get_auth(),
+                headers=self.get_headers(),
                 timeout=10
             )
             
@@ -171,6 +216,19 @@ class WebDAVManager:
         if not self.remote_path or self.remote_path == '/':
             return True
         
+        # 先用一次 PROPFIND 检查目录是否已存在，常见情况下无需逐级 MKCOL
+        try:
+            response = self.session.request(
+                "PROPFIND",
+                self.get_full_url(self.remote_path),
+                headers=self.get_headers({"Depth": "0"}),
+                timeout=10
+            )
+            if response.status_code == 207:
+                return True
+        except Exception as e:
+            self.logger.debug(f"检查WebDAV目录是否存在时出错: {e}")
+        
         # 分解路径并逐级创建
         parts = self.remote_path.strip('/').split('/')
         current_path = ""
@@ -184,37 +242,59 @@ class WebDAVManager:
         
         return True
     
+    def _put_config(self, file_url, body, etag=None):
+        """上传配置文件，已知远程 ETag 时带 If-Match，远程文件已被改动则由服务器返回 412"""
+        extra_headers = {"Content-Type": "application/json; charset=utf-8"}
+        if etag:
+            extra_headers["If-Match"] = etag
+        return self.session.put(
+            file_url,
+            headers=self.get_headers(extra_headers),
+            data=body,
+            timeout=30
+        )
+    
     def upload_config(self):
         """将配置上传到 WebDAV"""
-        if not self.enabled:
-            return False, "WebDAV 同步未启用"
-            
-        if not self.server_url or not self.username or not self.password:
-            return False, "服务器URL、用户名或密码未设置"
+        error = self._get_not_ready_reason()
+        if error:
+            return False, error
         
         try:
-            # 确保远程目录存在
-            if not self.ensure_directory_exists():
-                return False, "创建远程目录失败"
-            
             # 读取本地配置
             config = load_config()
             
             # 准备用于同步的配置（排除本地特定设置）
             sync_config = prepare_config_for_sync(config)
-            config_json = json.dumps(sync_config, ensure_ascii=False, indent=2)
+            body = json_utils.dumps(sync_config)
+            digest = _digest(body)
             
-            # 上传到WebDAV
+            # 内容与最近一次上传或下载的远程内容相同时跳过上传，不发送任何请求
             file_url = self.get_file_url()
-            response = requests.put(
-                file_url,
-                auth=self.get_auth(),
-                data=config_json,
-                headers={"Content-Type": "application/json"},
-                timeout=30
-            )
+            cached = _upload_cache.get(file_url)
+            if cached and cached[0] == digest:
+                return True, "配置未变化，无需上传"
+            
+            # 直接上传，只有服务器报告父目录不存在时才创建远程目录后重试
+            etag = cached[1] if cached else None
+            response = self._put_config(file_url, body, etag)
+            if response.status_code in (404, 409):
+                if not self.ensure_directory_exists():
+                    return False, "创建远程目录失败"
+                response = self._put_config(file_url, body, etag)
+            
+            if response.status_code == 412:
+                # 远程文件在上次同步后被其他设备修改，丢弃过期的 ETag，下次上传不再带条件
+                _upload_cache.pop(file_url, None)
+                _download_cache.pop(file_url, None)
+                return False, "远程配置已被其他设备修改，请先下载最新配置"
             
             if response.status_code >= 200 and response.status_code < 300:
+                etag = response.headers.get("ETag")
+                _upload_cache[file_url] = (digest, _strong_etag(etag))
+                if etag:
+                    # 远程内容就是刚上传的内容，下次下载可直接用条件请求
+                    _download_cache[file_url] = (etag, None, body)
                 return True, "配置已成功上传到 WebDAV"
             else:
                 return False, f"上传配置失败: {response.status_code}"
@@ -224,25 +304,49 @@ class WebDAVManager:
     
     def download_config(self):
         """从 WebDAV 下载配置"""
-        if not self.enabled:
-            return False, "WebDAV 同步未启用", None
-            
-        if not self.server_url or not self.username or not self.password:
-            return False, "服务器URL、用户名或密码未设置", None
+        error = self._get_not_ready_reason()
+        if error:
+            return False, error, None
         
         try:
-            # 获取WebDAV文件
+            # 获取WebDAV文件，带上次的 ETag/Last-Modified 发送条件请求，未变化时服务器返回 304 且不带响应体
             file_url = self.get_file_url()
-            response = requests.get(
+            cached = _download_cache.get(file_url)
+            extra_headers = {}
+            if cached:
+                if cached[0]:
+                    extra_headers["If-None-Match"] = cached[0]
+                if cached[1]:
+                    extra_headers["If-Modified-Since"] = cached[1]
+            response = self.session.get(
                 file_url,
-                auth=self.get_auth(),
+                headers=self.get_headers(extra_headers),
                 timeout=30
             )
             
-            if response.status_code == 200:
+            if response.status_code == 304 and cached:
+                content = cached[2]
+            elif response.status_code == 200:
+                content = response.content
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+                if etag or last_modified:
+                    _download_cache[file_url] = (etag, last_modified, content)
+                else:
+                    _download_cache.pop(file_url, None)
+                # 记录远程内容的摘要，内容未变时上传可直接跳过；下载得到的 ETag 不用作 If-Match
+                _upload_cache[file_url] = (_digest(content), None)
+            else:
+                content = None
+                if response.status_code == 404:
+                    # 远程文件已删除，缓存的状态全部失效
+                    _download_cache.pop(file_url, None)
+                    _upload_cache.pop(file_url, None)
+            
+            if content is not None:
                 # 解析JSON内容
                 try:
-                    synced_config = json.loads(response.text)
+                    synced_config = json_utils.loads(content)
                     
                     # 读取本地配置以保留本地特定设置
                     local_config = load_config()
@@ -251,7 +355,7 @@ class WebDAVManager:
                     merged_config = merge_synced_config(local_config, synced_config)
                     
                     return True, "配置已成功从 WebDAV 下载", merged_config
-                except json.JSONDecodeError:
+                except json_utils.JSONDecodeError:
                     return False, "下载的配置文件格式无效", None
             elif response.status_code == 404:
                 return False, "WebDAV上未找到配置文件", None